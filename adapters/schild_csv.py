@@ -1,10 +1,13 @@
 from __future__ import annotations
 
+import codecs
 import csv
-import io
+import os
 import warnings
+from collections.abc import Iterator
 from datetime import datetime
 from pathlib import Path
+from typing import TextIO
 
 from adapters.base import AdapterBase
 from core.models import ConfigField, StudentRecord, TeacherRecord
@@ -31,6 +34,37 @@ _TEACHER_FIELD_VARIANTS: dict[str, list[str]] = {
     "job_title": ["Amtsbezeichnung", "Amtsbez.", "Amtsbez", "Dienstbezeichnung"],
 }
 
+# Varianten in Kleinbuchstaben für den case-insensitiven Vergleich
+_STUDENT_FIELD_VARIANTS_LOWER: dict[str, list[str]] = {
+    k: [v.lower() for v in vs] for k, vs in _STUDENT_FIELD_VARIANTS.items()
+}
+_TEACHER_FIELD_VARIANTS_LOWER: dict[str, list[str]] = {
+    k: [v.lower() for v in vs] for k, vs in _TEACHER_FIELD_VARIANTS.items()
+}
+
+
+class _SchildDialect(csv.Dialect):
+    """CSV-Format der SchILD-Exporte (;-getrennt), einmal beim Import registriert."""
+
+    delimiter = ";"
+    quotechar = '"'
+    doublequote = True
+    skipinitialspace = False
+    lineterminator = "\r\n"
+    quoting = csv.QUOTE_MINIMAL
+
+
+csv.register_dialect("schild", _SchildDialect)
+
+# Blockgröße für die Encoding-Erkennung (Bytes)
+_SNIFF_CHUNK_SIZE = 4096
+
+# Schreibpuffer für den Write-back-Export (Bytes)
+_WRITE_BUFFER_SIZE = 1 << 20
+
+# Foto-Endungen in Prioritätsreihenfolge (erste gewinnt bei gleicher ID)
+_PHOTO_EXTENSIONS: tuple[str, ...] = (".jpg", ".jpeg", ".png")
+
 
 # ---------------------------------------------------------------------------
 # Generische CSV-Feld-Erkennung
@@ -38,36 +72,53 @@ _TEACHER_FIELD_VARIANTS: dict[str, list[str]] = {
 
 
 def _resolve_csv_column(
-    field_name: str,
-    row: dict,
-    field_variants: dict[str, list[str]],
+    variants: list[str],
+    variants_lower: list[str],
+    fieldnames: list[str],
+    header_lower: dict[str, str],
 ) -> str | None:
     """Findet den tatsächlichen CSV-Spaltennamen für ein Record-Feld.
 
-    Probiert jede Variante: zuerst exakter Match, dann case-insensitive.
+    Probiert jede Variante: zuerst exakter Match, dann case-insensitive
+    über ``header_lower`` ({bereinigter Kleinbuchstaben-Name: Spaltenname}).
     Gibt None zurück wenn keine Variante passt.
     """
-    variants = field_variants.get(field_name, [])
-    for variant in variants:
-        if variant in row:
+    for variant, variant_lower in zip(variants, variants_lower):
+        if variant in fieldnames:
             return variant
-        for key in row:
-            if key.strip().lower() == variant.lower():
-                return key
+        key = header_lower.get(variant_lower)
+        if key is not None:
+            return key
     return None
 
 
-def _get_field_value(
-    field_name: str,
-    row: dict,
+def _build_column_map(
+    header: list[str],
     field_variants: dict[str, list[str]],
-    default: str = "",
-) -> str:
-    """Extrahiert einen Feldwert aus einer CSV-Zeile per Varianten-Lookup."""
-    col = _resolve_csv_column(field_name, row, field_variants)
-    if col is None:
-        return default
-    return row.get(col, default).strip()
+    field_variants_lower: dict[str, list[str]],
+) -> dict[str, int | None]:
+    """Löst alle Record-Felder einmal pro Datei gegen die CSV-Kopfzeile auf.
+
+    Gibt {record_feld: spalten_index} zurück (None = Spalte fehlt).
+    """
+    # Bei doppelten Spaltennamen gewinnt die letzte (wie bei csv.DictReader)
+    index_by_name = {name: i for i, name in enumerate(header)}
+    # Case-insensitiv gewinnt die erste passende Spalte → rückwärts befüllen
+    header_lower = {name.strip().lower(): name for name in reversed(header)}
+    col_map: dict[str, int | None] = {}
+    for field_name, variants in field_variants.items():
+        col = _resolve_csv_column(
+            variants, field_variants_lower[field_name], header, header_lower
+        )
+        col_map[field_name] = index_by_name[col] if col is not None else None
+    return col_map
+
+
+def _cell(row: list[str], index: int | None) -> str:
+    """Liest eine Zelle per Index (leer bei fehlender Spalte oder kurzer Zeile)."""
+    if index is None or index >= len(row):
+        return ""
+    return row[index].strip()
 
 
 # ---------------------------------------------------------------------------
@@ -87,6 +138,7 @@ class SchildCsvAdapter(AdapterBase):
         self.csv_path = Path(csv_path)
         self.photos_dir = Path(photos_dir) if photos_dir else None
         self.teachers_csv_path = Path(teachers_csv_path) if teachers_csv_path else None
+        self._photo_index: dict[str, Path] | None = None  # lazy, pro load()
 
     # --- Metadaten ---
 
@@ -130,23 +182,10 @@ class SchildCsvAdapter(AdapterBase):
     # --- Interface ---
 
     def load(self) -> list[StudentRecord]:
-        if not self.csv_path.exists():
-            raise FileNotFoundError(f"CSV-Datei nicht gefunden: {self.csv_path}")
-
-        content = self._read_csv_content(self.csv_path)
-        if content is None:
-            raise ValueError(
-                f"CSV-Datei konnte weder als UTF-8 noch als ISO-8859-1 "
-                f"gelesen werden: {self.csv_path}"
-            )
-
-        reader = csv.DictReader(io.StringIO(content), delimiter=";")
-
         students: list[StudentRecord] = []
         skipped = 0
 
-        for row_num, row in enumerate(reader, start=2):  # Zeile 1 = Header
-            record = self._parse_row(row, row_num)
+        for record in self._iter_student_rows():
             if record:
                 students.append(record)
             else:
@@ -160,26 +199,54 @@ class SchildCsvAdapter(AdapterBase):
 
         return students
 
+    def iter_students(self) -> Iterator[StudentRecord]:
+        """Liefert die Schüler zeilenweise, ohne die ganze Liste aufzubauen.
+
+        Für Aufrufer, die nur einmal iterieren. Nicht parsebare Zeilen
+        werden übersprungen (Warnung pro Zeile wie bei ``load``).
+        """
+        for record in self._iter_student_rows():
+            if record:
+                yield record
+
+    def _iter_student_rows(self) -> Iterator[StudentRecord | None]:
+        """Streamt die Schüler-CSV: ein Ergebnis pro Zeile (None = übersprungen)."""
+        if not self.csv_path.exists():
+            raise FileNotFoundError(f"CSV-Datei nicht gefunden: {self.csv_path}")
+
+        self._photo_index = None  # Fotoordner bei jedem Laden neu einlesen
+
+        with self._open_csv(self.csv_path) as f:
+            reader = csv.reader(f, dialect="schild")
+            header = next(reader, [])
+            col_map = _build_column_map(
+                header, _STUDENT_FIELD_VARIANTS, _STUDENT_FIELD_VARIANTS_LOWER
+            )
+            rows = filter(None, reader)  # Leerzeilen überspringen
+            for row_num, row in enumerate(rows, start=2):  # Zeile 1 = Header
+                yield self._parse_row(row, col_map, row_num)
+
     def load_teachers(self) -> list[TeacherRecord]:
         """Liest Lehrerdaten aus einer separaten CSV-Datei."""
         if self.teachers_csv_path is None or not self.teachers_csv_path.exists():
             return []
 
-        content = self._read_csv_content(self.teachers_csv_path)
-        if content is None:
-            return []
-
-        reader = csv.DictReader(io.StringIO(content), delimiter=";")
-
         teachers: list[TeacherRecord] = []
         skipped = 0
 
-        for row_num, row in enumerate(reader, start=2):
-            record = self._parse_teacher_row(row, row_num)
-            if record:
-                teachers.append(record)
-            else:
-                skipped += 1
+        with self._open_csv(self.teachers_csv_path) as f:
+            reader = csv.reader(f, dialect="schild")
+            header = next(reader, [])
+            col_map = _build_column_map(
+                header, _TEACHER_FIELD_VARIANTS, _TEACHER_FIELD_VARIANTS_LOWER
+            )
+            rows = filter(None, reader)  # Leerzeilen überspringen
+            for row_num, row in enumerate(rows, start=2):
+                record = self._parse_teacher_row(row, col_map, row_num)
+                if record:
+                    teachers.append(record)
+                else:
+                    skipped += 1
 
         if skipped > 0:
             warnings.warn(
@@ -191,44 +258,48 @@ class SchildCsvAdapter(AdapterBase):
 
     # --- Parsing ---
 
-    def _parse_row(self, row: dict, row_num: int = 0) -> StudentRecord | None:
+    def _parse_row(
+        self, row: list[str], col_map: dict[str, int | None], row_num: int = 0
+    ) -> StudentRecord | None:
         """Parst eine CSV-Zeile in ein StudentRecord.
 
+        ``col_map`` kommt aus ``_build_column_map`` (Spaltenindex pro Feld).
         Gibt None zurück bei fehlenden Pflichtfeldern, loggt aber den Grund
         statt das Problem still zu verschlucken.
         """
         try:
-            sid = _get_field_value("school_internal_id", row, _STUDENT_FIELD_VARIANTS)
+            sid = _cell(row, col_map["school_internal_id"])
             if not sid:
                 return None
 
-            dob_raw = _get_field_value("dob", row, _STUDENT_FIELD_VARIANTS)
-            dob = self._normalize_date(dob_raw)
+            dob = self._normalize_date(_cell(row, col_map["dob"]))
 
             photo_path = self._find_photo(sid)
 
             return StudentRecord(
                 school_internal_id=sid,
-                first_name=_get_field_value("first_name", row, _STUDENT_FIELD_VARIANTS),
-                last_name=_get_field_value("last_name", row, _STUDENT_FIELD_VARIANTS),
+                first_name=_cell(row, col_map["first_name"]),
+                last_name=_cell(row, col_map["last_name"]),
                 dob=dob,
-                email=_get_field_value("email", row, _STUDENT_FIELD_VARIANTS),
-                class_name=_get_field_value("class_name", row, _STUDENT_FIELD_VARIANTS),
+                email=_cell(row, col_map["email"]),
+                class_name=_cell(row, col_map["class_name"]),
                 photo_path=str(photo_path) if photo_path else None,
-                gender=_get_field_value("gender", row, _STUDENT_FIELD_VARIANTS),
+                gender=_cell(row, col_map["gender"]),
             )
         except (KeyError, ValueError) as exc:
             warnings.warn(f"CSV Zeile {row_num} übersprungen: {exc}")
             return None
 
-    def _parse_teacher_row(self, row: dict, row_num: int = 0) -> TeacherRecord | None:
+    def _parse_teacher_row(
+        self, row: list[str], col_map: dict[str, int | None], row_num: int = 0
+    ) -> TeacherRecord | None:
         """Parst eine CSV-Zeile in ein TeacherRecord.
 
         Pflichtfelder: last_name + dob (bilden den composite_key).
         """
         try:
-            last_name = _get_field_value("last_name", row, _TEACHER_FIELD_VARIANTS)
-            dob_raw = _get_field_value("dob", row, _TEACHER_FIELD_VARIANTS)
+            last_name = _cell(row, col_map["last_name"])
+            dob_raw = _cell(row, col_map["dob"])
 
             if not last_name or not dob_raw:
                 return None
@@ -236,10 +307,10 @@ class SchildCsvAdapter(AdapterBase):
             dob = self._normalize_date(dob_raw)
 
             return TeacherRecord(
-                first_name=_get_field_value("first_name", row, _TEACHER_FIELD_VARIANTS),
+                first_name=_cell(row, col_map["first_name"]),
                 last_name=last_name,
                 dob=dob,
-                job_title=_get_field_value("job_title", row, _TEACHER_FIELD_VARIANTS),
+                job_title=_cell(row, col_map["job_title"]),
             )
         except (KeyError, ValueError) as exc:
             warnings.warn(f"Lehrer-CSV Zeile {row_num} übersprungen: {exc}")
@@ -262,18 +333,24 @@ class SchildCsvAdapter(AdapterBase):
         timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         out_path = self.csv_path.parent / f"email_update_{timestamp}.csv"
 
-        with open(out_path, "w", encoding="utf-8-sig", newline="") as f:
-            writer = csv.writer(f, delimiter=";")
+        with open(
+            out_path,
+            "w",
+            encoding="utf-8-sig",
+            newline="",
+            buffering=_WRITE_BUFFER_SIZE,
+        ) as f:
+            writer = csv.writer(f, dialect="schild")
             writer.writerow(["Klasse", "Vorname", "Nachname", "SchulEmail"])
-            for update in updates:
-                writer.writerow(
-                    [
-                        update.get("class_name", ""),
-                        update.get("first_name", ""),
-                        update.get("last_name", ""),
-                        update.get("email", ""),
-                    ]
+            writer.writerows(
+                (
+                    update.get("class_name", ""),
+                    update.get("first_name", ""),
+                    update.get("last_name", ""),
+                    update.get("email", ""),
                 )
+                for update in updates
+            )
 
         return [
             {
@@ -286,23 +363,42 @@ class SchildCsvAdapter(AdapterBase):
 
     # --- Hilfsmethoden ---
 
-    def _read_csv_content(self, path: Path) -> str | None:
-        """Liest CSV-Inhalt mit Encoding-Erkennung (UTF-8-sig, ISO-8859-1)."""
-        for encoding in ("utf-8-sig", "iso-8859-1"):
-            try:
-                return path.read_text(encoding=encoding)
-            except (UnicodeDecodeError, ValueError):
-                continue
-        warnings.warn(
-            f"CSV-Datei konnte weder als UTF-8 noch als ISO-8859-1 "
-            f"gelesen werden: {path}"
-        )
-        return None
+    def _open_csv(self, path: Path) -> TextIO:
+        """Öffnet eine CSV-Datei als Text-Stream mit Encoding-Erkennung."""
+        return open(path, encoding=self._detect_encoding(path), newline="")
+
+    def _detect_encoding(self, path: Path) -> str:
+        """Erkennt UTF-8 (mit/ohne BOM) oder ISO-8859-1.
+
+        UTF-8 nur, wenn die ganze Datei gültiges UTF-8 ist — ein einzelnes
+        Latin-1-Byte weiter hinten (z.B. zusammengefügte Exporte) führt zu
+        ISO-8859-1 statt zu einem Abbruch mitten im Laden. Geprüft wird
+        blockweise mit einem inkrementellen Decoder, ohne die Datei als
+        String aufzubauen; reine ASCII-Blöcke werden übersprungen.
+        """
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        with path.open("rb") as f:
+            while chunk := f.read(_SNIFF_CHUNK_SIZE):
+                pending = decoder.getstate()[0]
+                if chunk.isascii() and not pending:
+                    continue
+                try:
+                    decoder.decode(chunk)
+                except UnicodeDecodeError:
+                    return "iso-8859-1"
+        try:
+            decoder.decode(b"", final=True)
+        except UnicodeDecodeError:
+            return "iso-8859-1"
+        return "utf-8-sig"
 
     def _normalize_date(self, date_str: str) -> str:
         """Konvertiert deutsches Datumsformat (DD.MM.YYYY) nach ISO (YYYY-MM-DD)."""
         if not date_str:
             return ""
+        # Schnellpfad: festes SchILD-Format DD.MM.YYYY per Slicing umstellen
+        if len(date_str) == 10 and date_str[2] == "." and date_str[5] == ".":
+            return date_str[6:] + "-" + date_str[3:5] + "-" + date_str[:2]
         if "-" in date_str:
             return date_str  # Bereits ISO
         parts = date_str.split(".")
@@ -312,12 +408,24 @@ class SchildCsvAdapter(AdapterBase):
 
     def _find_photo(self, school_internal_id: str) -> Path | None:
         """Sucht ein Foto im Bilderordner anhand der SchILD-ID."""
-        if not self.photos_dir or not self.photos_dir.exists():
-            return None
-
-        for ext in (".jpg", ".jpeg", ".png"):
-            photo = self.photos_dir / f"{school_internal_id}{ext}"
-            if photo.exists():
-                return photo
-
-        return None
+        if self._photo_index is None:
+            self._photo_index = self._build_photo_index()
+        return self._photo_index.get(school_internal_id)
+
+    def _build_photo_index(self) -> dict[str, Path]:
+        """Liest den Bilderordner einmal ein: {SchILD-ID: Foto-Pfad}."""
+        if not self.photos_dir or not self.photos_dir.is_dir():
+            return {}
+
+        # os.scandir liefert Typinformationen aus dem Verzeichnis-Listing,
+        # ohne einen zusätzlichen stat()-Aufruf pro Datei
+        photos: list[tuple[int, str, str]] = []  # (Priorität, ID, Pfad)
+        with os.scandir(self.photos_dir) as entries:
+            for entry in entries:
+                stem, ext = os.path.splitext(entry.name)
+                ext = ext.lower()
+                if ext in _PHOTO_EXTENSIONS and entry.is_file():
+                    photos.append((_PHOTO_EXTENSIONS.index(ext), stem, entry.path))
+        # Niedrigste Priorität zuerst, damit .jpg vor .jpeg vor .png gewinnt
+        photos.sort(reverse=True)
+        return {stem: Path(path) for _, stem, path in photos}
@@ -1,8 +1,18 @@
 from __future__ import annotations
 
+import atexit
+import functools
 import logging
+import os
+import shutil
+import sys
 import tempfile
+import threading
 import warnings
+from collections import defaultdict
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, suppress
 
 from adapters.base import AdapterBase
 from core.models import (
@@ -14,6 +24,20 @@ from core.models import (
 
 log = logging.getLogger(__name__)
 
+# ---------------------------------------------------------------------------
+# Verbindungs-Pool: offene Verbindungen werden zwischen load(), load_teachers()
+# und write_back() wiederverwendet statt jedes Mal neu aufgebaut (TCP + Auth).
+# Schlüssel: (host, port, datenbank, benutzer, passwort)
+# ---------------------------------------------------------------------------
+
+_POOL_MAX_IDLE = 4
+
+# Parallele Abfragen in load() (Schüler, Hierarchie, Kurse, Fotos)
+_LOAD_WORKERS = 4
+
+_idle_connections: dict[tuple[str, int, str, str, str], list] = {}
+_pool_lock = threading.Lock()
+
 # ---------------------------------------------------------------------------
 # SQL-Queries — basierend auf SchILD-NRW-Schema (MariaDB)
 # ---------------------------------------------------------------------------
@@ -24,35 +48,30 @@ _SQL_EIGENESCHULE = """
     LIMIT 1
 """
 
-_SQL_STUDENTS = """
-    SELECT
-        s.ID                AS school_internal_id,
-        s.Vorname           AS first_name,
-        s.Name              AS last_name,
-        s.Geburtsdatum      AS dob,
-        s.SchulEmail        AS email,
-        s.Klasse            AS class_name,
-        s.Geschlecht        AS gender
-    FROM schueler s
-    WHERE s.Status = 2
-    ORDER BY s.Name, s.Vorname
-"""
-
-# Klassenlehrer kommen aus der Tabelle "versetzung" (Klassen-Tabelle).
-# Eine Zeile pro Klasse, NICHT pro Schüler.
+# Klassenlehrer kommen aus der Tabelle "versetzung" (Klassen-Tabelle, eine
+# Zeile pro Klasse) und werden direkt mitgejoint statt separat geladen.
 # KlassenlehrerKrz / StvKlassenlehrerKrz → k_lehrer.Kuerzel
-_SQL_CLASS_TEACHERS = """
+_SQL_STUDENTS = """
     SELECT
-        v.Klasse              AS class_name,
+        s.ID                  AS school_internal_id,
+        s.Vorname             AS first_name,
+        s.Name                AS last_name,
+        s.Geburtsdatum        AS dob,
+        s.SchulEmail          AS email,
+        s.Klasse              AS class_name,
+        s.Geschlecht          AS gender,
         v.KlassenlehrerKrz    AS teacher_1_krz,
         kl1.Nachname          AS teacher_1,
         kl1.EMailDienstlich   AS teacher_1_email,
         v.StvKlassenlehrerKrz AS teacher_2_krz,
         kl2.Nachname          AS teacher_2,
         kl2.EMailDienstlich   AS teacher_2_email
-    FROM versetzung v
-    LEFT JOIN k_lehrer kl1 ON v.KlassenlehrerKrz = kl1.Kuerzel
-    LEFT JOIN k_lehrer kl2 ON v.StvKlassenlehrerKrz = kl2.Kuerzel
+    FROM schueler s
+    LEFT JOIN versetzung v  ON v.Klasse = s.Klasse
+    LEFT JOIN k_lehrer kl1  ON v.KlassenlehrerKrz = kl1.Kuerzel
+    LEFT JOIN k_lehrer kl2  ON v.StvKlassenlehrerKrz = kl2.Kuerzel
+    WHERE s.Status = 2
+    ORDER BY s.Name, s.Vorname
 """
 
 # Leistungsdaten — Zwei-Schritt-Verfahren:
@@ -99,12 +118,16 @@ _SQL_TEACHERS = """
     ORDER BY kl.Nachname, kl.Vorname
 """
 
+# Gleicher Filter wie _SQL_STUDENTS als Subquery: feste Abfrage ohne
+# ID-Liste, muss nicht auf die Schülerabfrage warten
 _SQL_PHOTOS = """
     SELECT
         sf.Schueler_ID        AS student_id,
         sf.Foto               AS photo_blob
     FROM schuelerfotos sf
-    WHERE sf.Schueler_ID IN ({placeholders})
+    WHERE sf.Schueler_ID IN (
+        SELECT s.ID FROM schueler s WHERE s.Status = 2
+    )
 """
 
 # Kategorie-Hierarchie pro Klasse: Abteilung, Fachklasse, Schulgliederung (BKIndexTyp)
@@ -131,6 +154,43 @@ _SQL_WRITE_BACK_EMAIL = """
 """
 
 
+# ---------------------------------------------------------------------------
+# Hilfsfunktionen
+# ---------------------------------------------------------------------------
+
+
+def _shared_str(value: str | None) -> str:
+    """Bereinigt und interniert Werte, die sich über viele Zeilen wiederholen.
+
+    Klassen, Lehrkräfte und Fächer kommen pro Schüler- bzw. Kurszeile als
+    eigene String-Kopie vom Treiber; interniert teilen sie sich ein Objekt.
+    """
+    return sys.intern((value or "").strip())
+
+
+@functools.lru_cache(maxsize=8192)
+def _format_date(value) -> str:
+    """Konvertiert DB-Datumswert nach ISO-String (gecacht, viele gleiche Daten).
+
+    pymysql liefert date/datetime (hashbar) oder Strings.
+    """
+    if value is None:
+        return ""
+    # pymysql gibt datetime.datetime oder datetime.date zurück
+    if hasattr(value, "strftime"):
+        return value.strftime("%Y-%m-%d")
+    s = str(value).strip()
+    # Fallback: "DD.MM.YYYY" → "YYYY-MM-DD"
+    if "." in s:
+        parts = s.split(".")
+        if len(parts) == 3:
+            return f"{parts[2]}-{parts[1]}-{parts[0]}"
+    # Fallback: "YYYY-MM-DD HH:MM:SS" → "YYYY-MM-DD"
+    if " " in s:
+        return s.split(" ")[0]
+    return s
+
+
 class SchildDbAdapter(AdapterBase):
     """Liest Schülerdaten direkt aus der SchILD-Datenbank (MariaDB)."""
 
@@ -214,6 +274,16 @@ class SchildDbAdapter(AdapterBase):
 
     # --- Verbindung ---
 
+    def _pool_key(self) -> tuple[str, int, str, str, str]:
+        """Verbindungsparameter als Schlüssel für den Pool."""
+        return (
+            self.db_host,
+            int(self.db_port),
+            self.db_name,
+            self.db_user,
+            self.db_password,
+        )
+
     def _connect(self):
         """Stellt eine Verbindung zur SchILD-DB her (pymysql)."""
         try:
@@ -230,16 +300,61 @@ class SchildDbAdapter(AdapterBase):
             user=self.db_user,
             password=self.db_password,
             charset="utf8mb4",
+            # Zeilen direkt als Dict {Spaltenalias: Wert} vom Treiber
+            cursorclass=pymysql.cursors.DictCursor,
         )
 
+    @contextmanager
+    def _connection(self) -> Iterator:
+        """Leiht eine Verbindung aus dem Pool (oder baut eine neue auf).
+
+        Nach erfolgreicher Nutzung wird die offene Transaktion beendet und
+        die Verbindung zurückgelegt; nach einem Fehler wird sie geschlossen.
+        """
+        key = self._pool_key()
+        conn = None
+        with _pool_lock:
+            idle = _idle_connections.get(key)
+            if idle:
+                conn = idle.pop()
+        if conn is not None:
+            # Vom Server wegen wait_timeout getrennte Verbindungen neu aufbauen
+            conn.ping(reconnect=True)
+        else:
+            conn = self._connect()
+
+        try:
+            yield conn
+        except BaseException:
+            conn.close()
+            raise
+
+        import pymysql  # bereits geladen, sonst gäbe es keine Verbindung
+
+        # Lese-Snapshot beenden, damit der nächste load() aktuelle Daten sieht.
+        # Die Arbeit im with-Block ist hier schon erledigt: bricht die
+        # Verbindung erst jetzt weg, nicht mehr werfen, sondern verwerfen.
+        try:
+            conn.rollback()
+        except pymysql.MySQLError as exc:
+            log.debug("Verbindung nach Nutzung unbrauchbar, verworfen: %s", exc)
+            with suppress(pymysql.MySQLError):
+                conn.close()
+            return
+        with _pool_lock:
+            idle = _idle_connections.setdefault(key, [])
+            if len(idle) < _POOL_MAX_IDLE:
+                idle.append(conn)
+                return
+        conn.close()
+
     def test_connection(self) -> tuple[bool, str]:
         """Testet die Verbindung und gibt Schülerzahl zurück."""
         try:
-            conn = self._connect()
-            cursor = conn.cursor()
-            cursor.execute("SELECT COUNT(*) FROM schueler WHERE Status = 2")
-            count = cursor.fetchone()[0]
-            conn.close()
+            with self._connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT COUNT(*) AS n FROM schueler WHERE Status = 2")
+                count = cursor.fetchone()["n"]
             return (True, f"Verbunden. {count} aktive Schüler gefunden.")
         except Exception as exc:
             return (False, f"Verbindungsfehler: {exc}")
@@ -247,139 +362,24 @@ class SchildDbAdapter(AdapterBase):
     # --- Interface ---
 
     def load(self) -> list[StudentRecord]:
-        conn = self._connect()
-        cursor = conn.cursor()
-
-        # 1. Schüler laden
-        cursor.execute(_SQL_STUDENTS)
-        columns = [col[0] for col in cursor.description]
-        raw_students = [dict(zip(columns, row)) for row in cursor.fetchall()]
-
-        # 2. Klassenlehrer pro Klasse laden (versetzung = Klassen-Tabelle)
-        cursor.execute(_SQL_CLASS_TEACHERS)
-        ct_cols = [col[0] for col in cursor.description]
-        class_teachers_by_class: dict[str, dict] = {}
-        for row in cursor.fetchall():
-            ct = dict(zip(ct_cols, row))
-            klass = (ct.get("class_name") or "").strip()
-            if klass:
-                class_teachers_by_class[klass] = ct
-
-        # 3. Kategorie-Hierarchie pro Klasse laden
-        cursor.execute(_SQL_CLASS_HIERARCHY)
-        hier_cols = [col[0] for col in cursor.description]
-        hierarchy_by_class: dict[str, dict] = {}
-        for row in cursor.fetchall():
-            h = dict(zip(hier_cols, row))
-            klass = (h.get("class_name") or "").strip()
-            if klass and klass not in hierarchy_by_class:
-                hierarchy_by_class[klass] = h
-
-        # 4. Kurszuordnungen laden — Zwei-Schritt-Verfahren
-        # Schuljahr/Abschnitt: Config-Wert oder Fallback aus eigeneschule
-        schuljahr = self.schuljahr.strip()
-        abschnitt = self.abschnitt.strip()
-        if not schuljahr or not abschnitt:
-            cursor.execute(_SQL_EIGENESCHULE)
-            es_row = cursor.fetchone()
-            if es_row:
-                es_cols = [col[0] for col in cursor.description]
-                es = dict(zip(es_cols, es_row))
-                if not schuljahr:
-                    schuljahr = str(es.get("Schuljahr") or "").strip()
-                if not abschnitt:
-                    abschnitt = str(es.get("SchuljahrAbschnitt") or "").strip()
-            log.info(
-                "Schuljahr/Abschnitt aus Config leer → Fallback aus eigeneschule:"
-                " Schuljahr=%s, Halbjahr=%s",
-                schuljahr,
-                abschnitt,
-            )
-
-        # 4a: Abschnitt-IDs für das Schuljahr/Halbjahr ermitteln
-        cursor.execute(_SQL_ABSCHNITT_IDS, (schuljahr, abschnitt))
-        abschnitt_cols = [col[0] for col in cursor.description]
-        abschnitt_to_student: dict[int, str] = {}
-        for row in cursor.fetchall():
-            r = dict(zip(abschnitt_cols, row))
-            abschnitt_to_student[r["abschnitt_id"]] = str(r["student_id"])
-
-        log.info(
-            "Lernabschnitte: %d Abschnitte für Schuljahr=%s, Halbjahr=%s",
-            len(abschnitt_to_student),
-            schuljahr,
-            abschnitt,
-        )
-
-        # 4b: Leistungsdaten für diese Abschnitte laden
-        courses_by_student: dict[str, list[CourseAssignment]] = {}
-        if abschnitt_to_student:
-            abschnitt_ids = list(abschnitt_to_student.keys())
-            placeholders = ",".join(["%s"] * len(abschnitt_ids))
-            sql = _SQL_LEISTUNGSDATEN.replace("{placeholders}", placeholders)
-            cursor.execute(sql, abschnitt_ids)
-            course_cols = [col[0] for col in cursor.description]
-
-            raw_fachlehrer_count = 0
-            raw_fachlehrer_empty = 0
-
-            for row in cursor.fetchall():
-                c = dict(zip(course_cols, row))
-                sid = abschnitt_to_student.get(c["abschnitt_id"])
-                if not sid:
-                    continue
-
-                # Diagnostik: FachLehrer-Kürzel zählen
-                krz = (c.get("fachlehrer_krz") or "").strip()
-                raw_fachlehrer_count += 1
-                if not krz:
-                    raw_fachlehrer_empty += 1
-
-                # Lehrkraft: FachLehrer bevorzugt, Fallback auf Kurs-Lehrer
-                teacher = (c.get("teacher_name") or "").strip() or (
-                    c.get("kurs_teacher_name") or ""
-                ).strip()
-
-                assignment = CourseAssignment(
-                    course_name=(c.get("course_name") or "").strip(),
-                    teacher_name=teacher,
-                    course_id=str(c.get("kurs_id") or ""),
-                    kurs_bezeichnung=(c.get("kurs_bezeichnung") or "").strip(),
-                    kurs_zeugnisbez=(c.get("kurs_zeugnisbez") or "").strip(),
-                    kursart=(c.get("kursart") or "").strip(),
-                    teacher_kuerzel=krz,
-                    teacher_email=(c.get("fachlehrer_email") or "").strip(),
-                )
-                courses_by_student.setdefault(sid, []).append(assignment)
-
-            log.info(
-                "Leistungsdaten: %d Zeilen, davon %d ohne FachLehrer-Kürzel",
-                raw_fachlehrer_count,
-                raw_fachlehrer_empty,
-            )
-
-        # Diagnostik: Kurse/Lehrer-Daten
-        total_courses = sum(len(v) for v in courses_by_student.values())
-        with_teacher = sum(
-            1 for clist in courses_by_student.values() for c in clist if c.teacher_name
-        )
-        log.info(
-            "Kurse geladen: %d Zuordnungen für %d Schüler, davon %d mit Lehrkraft"
-            " (Schuljahr=%s, Abschnitt=%s)",
-            total_courses,
-            len(courses_by_student),
-            with_teacher,
-            schuljahr,
-            abschnitt,
-        )
+        # 1.–4. Unabhängige Abfragen parallel auf eigenen Pool-Verbindungen
+        with ThreadPoolExecutor(max_workers=_LOAD_WORKERS) as executor:
+            students_future = executor.submit(self._query_students)
+            hierarchy_future = executor.submit(self._query_class_hierarchy)
+            courses_future = executor.submit(self._query_courses)
+            photos_future = executor.submit(self._query_photos)
+
+            raw_students = students_future.result()
+            hierarchy_by_class = hierarchy_future.result()
+            courses_by_student = courses_future.result()
+            photos_by_sid = photos_future.result()
 
         # Diagnostik: Fachzuordnungen pro Klasse
-        sid_to_class: dict[str, str] = {}
+        sid_to_class: dict[int, str] = {}
         for raw in raw_students:
-            sid = str(raw.get("school_internal_id", "")).strip()
             klass = (raw.get("class_name") or "").strip()
-            if sid and klass:
-                sid_to_class[sid] = klass
+            if klass:
+                sid_to_class[raw["school_internal_id"]] = klass
         class_course_counts: dict[
             str, tuple[int, int]
         ] = {}  # {klasse: (total, mit_lehrer)}
@@ -399,51 +399,41 @@ class SchildDbAdapter(AdapterBase):
                 with_t,
             )
 
-        # 5. Fotos laden
-        student_ids = [
-            str(raw.get("school_internal_id", "")).strip()
-            for raw in raw_students
-            if str(raw.get("school_internal_id", "")).strip()
-        ]
-        photos_by_sid = self._load_photos(cursor, student_ids)
-
-        conn.close()
-
-        # 6. Zusammenbauen
+        # 5. Zusammenbauen
         students: list[StudentRecord] = []
         skipped = 0
 
         for raw in raw_students:
-            sid = str(raw.get("school_internal_id", "")).strip()
-            if not sid:
+            # IDs bleiben intern im Treiber-Typ (int), String nur im Record
+            student_id = raw["school_internal_id"]
+            if student_id is None:
                 skipped += 1
                 continue
 
-            class_name = (raw.get("class_name") or "").strip()
-            ct = class_teachers_by_class.get(class_name, {})
+            class_name = _shared_str(raw.get("class_name"))
             hier = hierarchy_by_class.get(class_name, {})
             dob = self._format_date(raw.get("dob"))
 
             students.append(
                 StudentRecord(
-                    school_internal_id=sid,
+                    school_internal_id=str(student_id),
                     first_name=(raw.get("first_name") or "").strip(),
                     last_name=(raw.get("last_name") or "").strip(),
                     dob=dob,
                     email=(raw.get("email") or "").strip(),
                     class_name=class_name,
-                    photo_path=photos_by_sid.get(sid),
+                    photo_path=photos_by_sid.get(student_id),
                     gender=str(raw.get("gender") or "").strip(),
-                    class_teacher_1=(ct.get("teacher_1") or "").strip(),
-                    class_teacher_2=(ct.get("teacher_2") or "").strip(),
-                    class_teacher_1_krz=(ct.get("teacher_1_krz") or "").strip(),
-                    class_teacher_2_krz=(ct.get("teacher_2_krz") or "").strip(),
-                    class_teacher_1_email=(ct.get("teacher_1_email") or "").strip(),
-                    class_teacher_2_email=(ct.get("teacher_2_email") or "").strip(),
+                    class_teacher_1=_shared_str(raw.get("teacher_1")),
+                    class_teacher_2=_shared_str(raw.get("teacher_2")),
+                    class_teacher_1_krz=_shared_str(raw.get("teacher_1_krz")),
+                    class_teacher_2_krz=_shared_str(raw.get("teacher_2_krz")),
+                    class_teacher_1_email=_shared_str(raw.get("teacher_1_email")),
+                    class_teacher_2_email=_shared_str(raw.get("teacher_2_email")),
                     abteilung=(hier.get("abteilung") or "").strip(),
                     fachklasse=(hier.get("fachklasse") or "").strip(),
                     schulgliederung=(hier.get("schulgliederung") or "").strip(),
-                    courses=courses_by_student.get(sid, []),
+                    courses=courses_by_student.get(student_id, []),
                 )
             )
 
@@ -453,14 +443,13 @@ class SchildDbAdapter(AdapterBase):
         return students
 
     def load_teachers(self) -> list[TeacherRecord]:
-        conn = self._connect()
-        cursor = conn.cursor()
-        cursor.execute(_SQL_TEACHERS)
-        columns = [col[0] for col in cursor.description]
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_TEACHERS)
+            rows = cursor.fetchall()
 
         teachers: list[TeacherRecord] = []
-        for row in cursor.fetchall():
-            raw = dict(zip(columns, row))
+        for raw in rows:
             last_name = (raw.get("last_name") or "").strip()
             dob = self._format_date(raw.get("dob"))
             if not last_name or not dob:
@@ -475,7 +464,6 @@ class SchildDbAdapter(AdapterBase):
                 )
             )
 
-        conn.close()
         return teachers
 
     # --- Write-back ---
@@ -488,10 +476,40 @@ class SchildDbAdapter(AdapterBase):
 
         updates: [{"school_internal_id": "123", "email": "m.mueller@schule.de"}]
         """
-        conn = self._connect()
-        cursor = conn.cursor()
-        results: list[dict] = []
+        from pymysql import MySQLError
+
+        params = [
+            (u["email"], u.get("school_internal_id", ""))
+            for u in updates
+            if "email" in u
+        ]
+
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            try:
+                cursor.executemany(_SQL_WRITE_BACK_EMAIL, params)
+            except MySQLError as exc:
+                # Fehler einzelnen Schülern zuordnen → zeilenweise wiederholen
+                log.warning("Sammel-Update fehlgeschlagen (%s), einzeln...", exc)
+                results = self._write_back_rows(cursor, updates)
+            else:
+                results = [
+                    {
+                        "school_internal_id": u.get("school_internal_id", ""),
+                        "success": True,
+                        "message": "",
+                    }
+                    for u in updates
+                ]
+
+            conn.commit()
+
+        return results
 
+    @staticmethod
+    def _write_back_rows(cursor, updates: list[dict]) -> list[dict]:
+        """Schreibt Updates einzeln (für Fehlerzuordnung pro Schüler)."""
+        results: list[dict] = []
         for update in updates:
             sid = update.get("school_internal_id", "")
             try:
@@ -508,59 +526,174 @@ class SchildDbAdapter(AdapterBase):
                         "message": str(exc),
                     }
                 )
-
-        conn.commit()
-        conn.close()
         return results
 
+    # --- Abfragen (je eine Pool-Verbindung, threadsicher) ---
+
+    def _query_students(self) -> list[dict]:
+        """1. Schüler inkl. Klassenlehrer laden."""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_STUDENTS)
+            return cursor.fetchall()
+
+    def _query_class_hierarchy(self) -> dict[str, dict]:
+        """2. Kategorie-Hierarchie pro Klasse laden."""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(_SQL_CLASS_HIERARCHY)
+            rows = cursor.fetchall()
+
+        hierarchy_by_class: dict[str, dict] = {}
+        for h in rows:
+            klass = (h.get("class_name") or "").strip()
+            if klass and klass not in hierarchy_by_class:
+                hierarchy_by_class[klass] = h
+
+        return hierarchy_by_class
+
+    def _query_courses(self) -> dict[int, list[CourseAssignment]]:
+        """3. Kurszuordnungen laden — Zwei-Schritt-Verfahren."""
+        with self._connection() as conn:
+            cursor = conn.cursor()
+            # Schuljahr/Abschnitt: Config-Wert oder Fallback aus eigeneschule
+            schuljahr = self.schuljahr.strip()
+            abschnitt = self.abschnitt.strip()
+            if not schuljahr or not abschnitt:
+                cursor.execute(_SQL_EIGENESCHULE)
+                es = cursor.fetchone()
+                if es:
+                    if not schuljahr:
+                        schuljahr = str(es.get("Schuljahr") or "").strip()
+                    if not abschnitt:
+                        abschnitt = str(es.get("SchuljahrAbschnitt") or "").strip()
+                log.info(
+                    "Schuljahr/Abschnitt aus Config leer → Fallback aus eigeneschule:"
+                    " Schuljahr=%s, Halbjahr=%s",
+                    schuljahr,
+                    abschnitt,
+                )
+
+            # 3a: Abschnitt-IDs für das Schuljahr/Halbjahr ermitteln
+            cursor.execute(_SQL_ABSCHNITT_IDS, (schuljahr, abschnitt))
+            abschnitt_to_student: dict[int, int] = {
+                r["abschnitt_id"]: r["student_id"] for r in cursor.fetchall()
+            }
+
+            log.info(
+                "Lernabschnitte: %d Abschnitte für Schuljahr=%s, Halbjahr=%s",
+                len(abschnitt_to_student),
+                schuljahr,
+                abschnitt,
+            )
+
+            # 3b: Leistungsdaten für diese Abschnitte laden
+            courses_by_student: defaultdict[int, list[CourseAssignment]] = defaultdict(
+                list
+            )
+            if abschnitt_to_student:
+                abschnitt_ids = list(abschnitt_to_student.keys())
+                placeholders = ",".join(["%s"] * len(abschnitt_ids))
+                sql = _SQL_LEISTUNGSDATEN.replace("{placeholders}", placeholders)
+                cursor.execute(sql, abschnitt_ids)
+
+                raw_fachlehrer_count = 0
+                raw_fachlehrer_empty = 0
+
+                for c in cursor.fetchall():
+                    sid = abschnitt_to_student.get(c["abschnitt_id"])
+                    if sid is None:
+                        continue
+
+                    # Diagnostik: FachLehrer-Kürzel zählen
+                    krz = _shared_str(c.get("fachlehrer_krz"))
+                    raw_fachlehrer_count += 1
+                    if not krz:
+                        raw_fachlehrer_empty += 1
+
+                    # Lehrkraft: FachLehrer bevorzugt, Fallback auf Kurs-Lehrer
+                    teacher = _shared_str(c.get("teacher_name")) or _shared_str(
+                        c.get("kurs_teacher_name")
+                    )
+
+                    assignment = CourseAssignment(
+                        course_name=_shared_str(c.get("course_name")),
+                        teacher_name=teacher,
+                        course_id=str(c.get("kurs_id") or ""),
+                        kurs_bezeichnung=_shared_str(c.get("kurs_bezeichnung")),
+                        kurs_zeugnisbez=_shared_str(c.get("kurs_zeugnisbez")),
+                        kursart=_shared_str(c.get("kursart")),
+                        teacher_kuerzel=krz,
+                        teacher_email=_shared_str(c.get("fachlehrer_email")),
+                    )
+                    courses_by_student[sid].append(assignment)
+
+                log.info(
+                    "Leistungsdaten: %d Zeilen, davon %d ohne FachLehrer-Kürzel",
+                    raw_fachlehrer_count,
+                    raw_fachlehrer_empty,
+                )
+
+            # Diagnostik: Kurse/Lehrer-Daten
+            total_courses = sum(len(v) for v in courses_by_student.values())
+            with_teacher = sum(
+                1
+                for clist in courses_by_student.values()
+                for c in clist
+                if c.teacher_name
+            )
+            log.info(
+                "Kurse geladen: %d Zuordnungen für %d Schüler, davon %d mit Lehrkraft"
+                " (Schuljahr=%s, Abschnitt=%s)",
+                total_courses,
+                len(courses_by_student),
+                with_teacher,
+                schuljahr,
+                abschnitt,
+            )
+
+        return courses_by_student
+
+    def _query_photos(self) -> dict[int, str]:
+        """4. Fotos laden (Temp-Dateien, siehe _load_photos).
+
+        Ein eigener Temp-Ordner pro load(), der beim Beenden der
+        Anwendung komplett entfernt wird.
+        """
+        photo_dir = tempfile.mkdtemp(prefix="schild_photos_")
+        atexit.register(shutil.rmtree, photo_dir, ignore_errors=True)
+        with self._connection() as conn:
+            return self._load_photos(conn, photo_dir)
+
     # --- Hilfsmethoden ---
 
     @staticmethod
-    def _load_photos(cursor, student_ids: list[str]) -> dict[str, str]:
+    def _load_photos(conn, photo_dir: str) -> dict[int, str]:
         """Lädt Fotos aus schuelerfotos und speichert als temp-Dateien.
 
-        Gibt ein Dict {student_id: temp_file_path} zurück.
+        Nutzt einen ungepufferten Server-Side-Cursor: die MEDIUMBLOBs werden
+        zeilenweise vom Server gelesen und sofort auf Platte geschrieben,
+        statt alle Fotos gleichzeitig im Speicher zu halten.
+
+        Gibt ein Dict {student_id: pfad} zurück (<photo_dir>/<id>.jpg).
         """
-        if not student_ids:
-            return {}
-
-        placeholders = ",".join(["%s"] * len(student_ids))
-        sql = _SQL_PHOTOS.replace("{placeholders}", placeholders)
-        cursor.execute(sql, student_ids)
-
-        photos: dict[str, str] = {}
-        photo_cols = [col[0] for col in cursor.description]
-        for row in cursor.fetchall():
-            p = dict(zip(photo_cols, row))
-            sid = str(p["student_id"])
-            blob = p.get("photo_blob")
-            if not blob:
-                continue
-            # MEDIUMBLOB als temporäre Datei speichern
-            tmp = tempfile.NamedTemporaryFile(
-                suffix=".jpg", prefix=f"schild_photo_{sid}_", delete=False
-            )
-            tmp.write(blob)
-            tmp.close()
-            photos[sid] = tmp.name
+        from pymysql.cursors import SSCursor
+
+        photos: dict[int, str] = {}
+        with conn.cursor(SSCursor) as cursor:
+            cursor.execute(_SQL_PHOTOS)
+            for student_id, blob in cursor:
+                if not blob:
+                    continue
+                # MEDIUMBLOB als temporäre Datei speichern
+                path = os.path.join(photo_dir, f"{student_id}.jpg")
+                with open(path, "wb") as f:
+                    f.write(blob)
+                photos[student_id] = path
 
         return photos
 
     @staticmethod
     def _format_date(value) -> str:
         """Konvertiert DB-Datumswert (DATETIME) nach ISO-String (YYYY-MM-DD)."""
-        if value is None:
-            return ""
-        # pymysql gibt datetime.datetime oder datetime.date zurück
-        if hasattr(value, "strftime"):
-            return value.strftime("%Y-%m-%d")
-        s = str(value).strip()
-        # Fallback: "DD.MM.YYYY" → "YYYY-MM-DD"
-        if "." in s:
-            parts = s.split(".")
-            if len(parts) == 3:
-                return f"{parts[2]}-{parts[1]}-{parts[0]}"
-        # Fallback: "YYYY-MM-DD HH:MM:SS" → "YYYY-MM-DD"
-        if " " in s:
-            return s.split(" ")[0]
-        return s
+        return _format_date(value)
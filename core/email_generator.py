@@ -4,6 +4,9 @@ from __future__ import annotations
 
 import re
 
+# Alles außer a-z, 0-9, Punkt und Bindestrich (für _sanitize)
+_SANITIZE_RE = re.compile(r"[^a-z0-9.\-]")
+
 # Mapping für gängige Sonderzeichen im deutschsprachigen Schulkontext
 _TRANSLITERATION: dict[str, str] = {
     # Deutsch
@@ -56,24 +59,34 @@ _TRANSLITERATION: dict[str, str] = {
 }
 
 
+class _TransliterationTable(dict):
+    """Übersetzungstabelle für ``str.translate`` mit Großbuchstaben-Fallback.
+
+    Vorbelegt mit ``_TRANSLITERATION``; unbekannte Zeichen werden beim
+    ersten Auftreten über ihre Lowercase-Form aufgelöst und gecacht.
+    """
+
+    def __missing__(self, codepoint: int) -> str:
+        ch = chr(codepoint)
+        replacement = _TRANSLITERATION.get(ch.lower())
+        if replacement is None:
+            replacement = ch
+        elif ch.isupper():
+            replacement = replacement.capitalize()
+        self[codepoint] = replacement
+        return replacement
+
+
+_TRANSLATION_TABLE = _TransliterationTable(str.maketrans(_TRANSLITERATION))
+
+
 def transliterate(text: str) -> str:
     """Ersetzt Sonderzeichen durch ASCII-Äquivalente.
 
     Erkennt automatisch Großbuchstaben-Varianten (Ç → C, Ş → S, etc.)
     anhand der Lowercase-Einträge in der Tabelle.
     """
-    result: list[str] = []
-    for ch in text:
-        if ch in _TRANSLITERATION:
-            result.append(_TRANSLITERATION[ch])
-        elif ch.lower() in _TRANSLITERATION:
-            replacement = _TRANSLITERATION[ch.lower()]
-            if ch.isupper():
-                replacement = replacement.capitalize()
-            result.append(replacement)
-        else:
-            result.append(ch)
-    return "".join(result)
+    return text.translate(_TRANSLATION_TABLE)
 
 
 def generate_email(
@@ -122,6 +135,4 @@ def generate_email(
 
 def _sanitize(text: str) -> str:
     """Lowercase, nur a-z, 0-9, Punkt und Bindestrich behalten."""
-    text = text.lower().strip()
-    text = re.sub(r"[^a-z0-9.\-]", "", text)
-    return text
+    return _SANITIZE_RE.sub("", text.lower().strip())
@@ -1,10 +1,13 @@
 from __future__ import annotations
 
-from dataclasses import asdict
+from dataclasses import fields
 
 from core.models import ChangeSet, StudentRecord
 from plugins.base import PluginBase
 
+# Feldnamen einmal beim Import ermitteln (Reihenfolge wie im Dataclass)
+_STUDENT_FIELDS: tuple[str, ...] = tuple(f.name for f in fields(StudentRecord))
+
 
 def compute_changeset(
     source: list[StudentRecord],
@@ -16,7 +19,7 @@ def compute_changeset(
     # Source als Dict indexiert nach school_internal_id
     source_map: dict[str, dict] = {}
     for student in source:
-        d = asdict(student)
+        d = _student_to_dict(student)
         d["_data_hash"] = plugin.compute_data_hash(d)
         source_map[student.school_internal_id] = d
 
@@ -84,6 +87,15 @@ def compute_changeset(
     )
 
 
+def _student_to_dict(student: StudentRecord) -> dict:
+    """Flaches Dict statt asdict(): keine rekursive Kopie der Kursliste.
+
+    ``courses`` bleibt eine Liste von CourseAssignment-Objekten — die Plugins
+    akzeptieren Kurse als Dict oder Objekt.
+    """
+    return {name: getattr(student, name) for name in _STUDENT_FIELDS}
+
+
 def _compute_photo_hash_if_available(plugin: PluginBase, photo_path: str) -> str | None:
     """Berechnet den Photo-Hash über das Plugin, falls die Methode existiert."""
     if hasattr(plugin, "compute_photo_hash"):
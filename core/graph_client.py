@@ -3,7 +3,15 @@
 from __future__ import annotations
 
 import logging
+import os
+import random
+import threading
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import parsedate_to_datetime
+from json import loads as _json_loads
+from typing import ClassVar
 
 import requests
 
@@ -11,11 +19,42 @@ log = logging.getLogger(__name__)
 
 _TOKEN_URL = "https://login.microsoftonline.com/{tenant_id}/oauth2/v2.0/token"
 _GRAPH_BASE = "https://graph.microsoft.com/v1.0"
+_DIRECTORY_OBJECT_URL = _GRAPH_BASE + "/directoryObjects/"
 _TOKEN_SCOPE = "https://graph.microsoft.com/.default"
 
-# Retry bei Throttling (429)
-_MAX_RETRIES = 3
-_DEFAULT_RETRY_AFTER = 5  # Sekunden
+# Notschalter: Keep-Alive abschalten (frische SSL-Connection pro Request),
+# falls der gebündelte OpenSSL-Build beim Connection-Reuse abstürzt
+_NO_KEEPALIVE_ENV = "SCHILD_SPIDER_NO_KEEPALIVE"
+
+# Retry bei Throttling (429) und vorübergehenden Serverfehlern
+_MAX_RETRIES = 5
+_RETRY_STATUS = frozenset({429, 502, 503, 504, 509})
+# 5xx nur bei idempotenten Methoden wiederholen — ein POST (z.B. User anlegen)
+# könnte trotz Fehlerantwort schon ausgeführt worden sein. 429 wurde dagegen
+# sicher abgewiesen und darf immer wiederholt werden.
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "PUT", "PATCH", "DELETE"})
+_BACKOFF_BASE = 1.0  # Sekunden, verdoppelt pro Versuch
+_MAX_BACKOFF = 60.0  # Obergrenze pro Wartezeit
+_BACKOFF_JITTER = 1.0  # zufälliger Zuschlag gegen synchrone Retry-Wellen
+_MAX_RETRY_WAIT = 300.0  # Obergrenze für die gesamte Wartezeit eines Requests
+
+# Parallele Listenabfragen (fetch_many); Session-Pool hat 10 Verbindungen
+_FETCH_WORKERS = 8
+# Lizenz-SKUs ändern sich während eines Laufs nicht
+_SKU_CACHE_TTL = 600.0  # Sekunden
+
+# Token-Cache über GraphClient-Instanzen hinweg (nur im Prozess, nie auf Platte)
+# (tenant_id, client_id, client_secret) → (token, expires_at)
+_token_cache: dict[tuple[str, str, str], tuple[str, float]] = {}
+_token_cache_lock = threading.Lock()
+
+# Delta-Stand der User-Liste pro (tenant_id, client_id, domain), nur im Prozess:
+# (deltaLink, {user_id: user}) — Folgeabfragen holen nur noch Änderungen
+_user_delta_cache: dict[tuple[str, str, str], tuple[str, dict[str, dict]]] = {}
+_user_delta_lock = threading.Lock()
+
+# Max. Werte pro "in (...)"-Filter (Graph-Limit für advanced queries: 15)
+_FILTER_IN_LIMIT = 15
 
 
 class GraphApiError(Exception):
@@ -27,6 +66,57 @@ class GraphApiError(Exception):
         super().__init__(f"Graph API {status_code}: {message} ({error_code})")
 
 
+def _is_retryable(method: str, status_code: int) -> bool:
+    """Prüft ob eine Fehlerantwort wiederholt werden darf."""
+    if status_code == 429:
+        return True
+    return status_code in _RETRY_STATUS and method.upper() in _IDEMPOTENT_METHODS
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+    """Liest den Retry-After-Header (Sekunden oder HTTP-Datum)."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+
+def _backoff_delay(attempt: int, retry_after: float | None) -> float:
+    """Exponentielles Backoff mit Jitter; Retry-After gilt als Untergrenze."""
+    backoff = min(_MAX_BACKOFF, _BACKOFF_BASE * 2**attempt)
+    return max(retry_after or 0.0, backoff) + random.uniform(0, _BACKOFF_JITTER)
+
+
+def _merge_user_delta(
+    cached: dict[str, dict], changes: list[dict], domain: str
+) -> dict[str, dict]:
+    """Arbeitet Delta-Einträge in den User-Stand ein (nur User der Domain)."""
+    suffix = f"@{domain}".lower()
+    users = dict(cached)
+    for item in changes:
+        uid = item.get("id")
+        if not uid:
+            continue
+        if "@removed" in item:
+            users.pop(uid, None)
+            continue
+        # Geänderte User enthalten u.U. nur die geänderten Properties
+        props = {k: v for k, v in item.items() if not k.startswith("@")}
+        merged = {**users[uid], **props} if uid in users else props
+        if (merged.get("userPrincipalName") or "").lower().endswith(suffix):
+            users[uid] = merged
+        else:
+            users.pop(uid, None)
+    return users
+
+
 class GraphClient:
     """HTTP-Client für Microsoft Graph API (Application Permissions)."""
 
@@ -34,13 +124,42 @@ class GraphClient:
         self._tenant_id = tenant_id
         self._client_id = client_id
         self._client_secret = client_secret
+        # Session mit Keep-Alive: Graph- und Token-Requests teilen sich die
+        # TCP/TLS-Verbindungen statt pro Request neu zu verbinden.
         self._session = requests.Session()
-        # Keep-Alive deaktivieren — jede Request nutzt eine frische SSL-Connection.
-        # Verhindert Access Violations durch SSL Connection Reuse, die auf Windows
-        # mit PyInstaller's gebundeltem OpenSSL auftreten können.
-        self._session.headers["Connection"] = "close"
+        if os.environ.get(_NO_KEEPALIVE_ENV):
+            # Alter Workaround: Access Violations durch SSL Connection Reuse
+            # mit PyInstaller's gebündeltem OpenSSL auf einzelnen Windows-Systemen
+            log.info("Keep-Alive deaktiviert (%s gesetzt)", _NO_KEEPALIVE_ENV)
+            self._session.headers["Connection"] = "close"
         self._token: str = ""
         self._token_expires: float = 0.0
+        self._token_lock = threading.Lock()
+        self._skus: list[dict] | None = None
+        self._skus_fetched: float = 0.0
+        # Graph-Header einmal aufbauen; Authorization setzt _get_token.
+        # Nicht in session.headers: der Token-Request (Form-Daten) nutzt
+        # dieselbe Session und darf kein JSON-Content-Type erben.
+        self._headers: dict[str, str] = {
+            "Content-Type": "application/json",
+            "ConsistencyLevel": "eventual",
+        }
+
+    def warmup(self) -> None:
+        """Baut Token und TLS-Verbindung zu Graph im Hintergrund auf.
+
+        Der erste echte Request findet dann Token und Keep-Alive-Verbindung
+        bereits vor. Fehler werden hier nur geloggt — der echte Request
+        meldet sie erneut.
+        """
+        threading.Thread(target=self._warmup, name="graph-warmup", daemon=True).start()
+
+    def _warmup(self) -> None:
+        try:
+            self._get_token()
+            self._session.head(_GRAPH_BASE + "/$metadata", timeout=5)
+        except (GraphApiError, requests.RequestException) as exc:
+            log.debug("Graph-Warmup fehlgeschlagen: %s", exc)
 
     # --- Token-Management ---
 
@@ -48,10 +167,27 @@ class GraphClient:
         """Holt oder cached einen Bearer-Token (Client Credentials Flow)."""
         if self._token and time.time() < self._token_expires - 60:
             return self._token
-
+        with self._token_lock:
+            # Parallele Aufrufer (fetch_many) holen den Token nur einmal
+            if self._token and time.time() < self._token_expires - 60:
+                return self._token
+            cache_key = (self._tenant_id, self._client_id, self._client_secret)
+            with _token_cache_lock:
+                cached = _token_cache.get(cache_key)
+            if cached and time.time() < cached[1] - 60:
+                self._token, self._token_expires = cached
+                self._headers["Authorization"] = f"Bearer {self._token}"
+                return self._token
+            token = self._refresh_token()
+            with _token_cache_lock:
+                _token_cache[cache_key] = (token, self._token_expires)
+            return token
+
+    def _refresh_token(self) -> str:
+        """Fordert einen neuen Token an und setzt den Authorization-Header."""
         token_url = _TOKEN_URL.format(tenant_id=self._tenant_id)
         log.debug("Token-Request: POST %s", token_url)
-        resp = requests.post(
+        resp = self._session.post(
             token_url,
             data={
                 "grant_type": "client_credentials",
@@ -77,6 +213,7 @@ class GraphClient:
         data = resp.json()
         self._token = data["access_token"]
         self._token_expires = time.time() + data.get("expires_in", 3600)
+        self._headers["Authorization"] = f"Bearer {self._token}"
         return self._token
 
     # --- HTTP-Kern ---
@@ -89,31 +226,64 @@ class GraphClient:
         params: dict | None = None,
     ) -> dict:
         """Sendet einen Request an die Graph API mit Auth + Retry."""
-        url = f"{_GRAPH_BASE}{path}" if path.startswith("/") else path
+        url = _GRAPH_BASE + path if path.startswith("/") else path
         log.debug("%s %s params=%s", method, url, params)
 
-        for attempt in range(_MAX_RETRIES):
-            token = self._get_token()
-            resp = self._session.request(
-                method,
-                url,
-                json=json,
-                params=params,
-                headers={
-                    "Authorization": f"Bearer {token}",
-                    "Content-Type": "application/json",
-                    "ConsistencyLevel": "eventual",
-                },
-                timeout=30,
-            )
+        deadline = time.monotonic() + _MAX_RETRY_WAIT
+        attempt = 0
+        while True:
+            self._get_token()  # erneuert bei Ablauf auch den Authorization-Header
+            try:
+                resp = self._session.request(
+                    method,
+                    url,
+                    json=json,
+                    params=params,
+                    headers=self._headers,
+                    timeout=30,
+                )
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                # Netzwerkfehler: ob der Request ankam ist unklar → nur
+                # idempotente Methoden wiederholen
+                if (
+                    method.upper() not in _IDEMPOTENT_METHODS
+                    or attempt + 1 >= _MAX_RETRIES
+                ):
+                    raise
+                delay = _backoff_delay(attempt, None)
+                if time.monotonic() + delay > deadline:
+                    raise
+                log.warning(
+                    "%s %s: %s, Retry %d/%d nach %.1fs",
+                    method,
+                    url,
+                    type(exc).__name__,
+                    attempt + 1,
+                    _MAX_RETRIES - 1,
+                    delay,
+                )
+                time.sleep(delay)
+                attempt += 1
+                continue
 
             log.debug("Response: %s %s", resp.status_code, method)
 
-            if resp.status_code == 429:
-                retry_after = int(resp.headers.get("Retry-After", _DEFAULT_RETRY_AFTER))
-                log.warning("Throttled (429), retry nach %ds", retry_after)
-                time.sleep(retry_after)
-                continue
+            if _is_retryable(method, resp.status_code) and attempt + 1 < _MAX_RETRIES:
+                delay = _backoff_delay(
+                    attempt, _parse_retry_after(resp.headers.get("Retry-After"))
+                )
+                if time.monotonic() + delay <= deadline:
+                    log.warning(
+                        "HTTP %s, Retry %d/%d nach %.1fs",
+                        resp.status_code,
+                        attempt + 1,
+                        _MAX_RETRIES - 1,
+                        delay,
+                    )
+                    time.sleep(delay)
+                    attempt += 1
+                    continue
+            # Retries erschöpft → normale Fehlerbehandlung unten
 
             if resp.status_code == 204:
                 return {}
@@ -121,39 +291,67 @@ class GraphClient:
             if resp.status_code >= 400:
                 body = {}
                 try:
-                    body = resp.json()
-                except Exception:
+                    body = _json_loads(resp.content) if resp.content else {}
+                except ValueError:
                     pass
                 error = body.get("error", {})
                 msg = error.get("message", "") or resp.text
                 code = error.get("code", "")
                 log.error(
-                    "Graph API Fehler: %s %s → %s [%s] %s",
+                    "Graph API Fehler: %s %s → %s [%s] %s (request-id %s)",
                     method,
                     url,
                     resp.status_code,
                     code,
                     msg,
+                    resp.headers.get("request-id", "-"),
                 )
                 raise GraphApiError(resp.status_code, msg, code)
 
-            if not resp.content:
+            # Bytes direkt parsen (json erkennt UTF-8 selbst) — spart
+            # requests' Encoding-Erkennung und die Dekodierung zu str
+            content = resp.content
+            if not content:
                 return {}
-            return resp.json()
+            return _json_loads(content)
 
-        raise GraphApiError(429, "Throttling: max retries erreicht")
+    def _iter_paged(self, path: str, params: dict | None = None) -> Iterator[dict]:
+        """Liefert die Einträge einer paginierten Antwort Seite für Seite.
 
-    def _request_paged(self, path: str, params: dict | None = None) -> list[dict]:
-        """Holt alle Seiten einer paginierten Antwort."""
-        results: list[dict] = []
+        Die nächste Seite wird erst angefragt wenn die aktuelle verbraucht
+        ist — wer früh abbricht, spart die restlichen Requests.
+        """
         resp = self._request("GET", path, params=params)
-        results.extend(resp.get("value", []))
+        yield from resp.get("value", [])
 
         while "@odata.nextLink" in resp:
             resp = self._request("GET", resp["@odata.nextLink"])
-            results.extend(resp.get("value", []))
+            yield from resp.get("value", [])
+
+    def _request_first(self, path: str, params: dict | None = None) -> dict | None:
+        """Holt nur den ersten Treffer ($top=1, ein Request, kein Paging)."""
+        resp = self._request("GET", path, params={**(params or {}), "$top": "1"})
+        values = resp.get("value", [])
+        return values[0] if values else None
+
+    def _request_paged(self, path: str, params: dict | None = None) -> list[dict]:
+        """Holt alle Seiten einer paginierten Antwort."""
+        return list(self._iter_paged(path, params))
+
+    def fetch_many(self, specs: list[tuple[str, dict | None]]) -> list[list[dict]]:
+        """Holt mehrere unabhängige paginierte Listen parallel.
 
-        return results
+        specs: Liste von (path, params) wie bei _request_paged.
+        Ergebnis in derselben Reihenfolge wie specs.
+        """
+        if len(specs) <= 1:
+            return [self._request_paged(path, params) for path, params in specs]
+        workers = min(_FETCH_WORKERS, len(specs))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            futures = [
+                pool.submit(self._request_paged, path, params) for path, params in specs
+            ]
+            return [f.result() for f in futures]
 
     # --- User-Operationen ---
 
@@ -161,6 +359,9 @@ class GraphClient:
         "id,employeeId,givenName,surname,department,"
         "userPrincipalName,accountEnabled,mail,displayName"
     )
+    _USER_SELECT_PARAMS: ClassVar[dict[str, str]] = {"$select": _USER_SELECT}
+    _GROUP_SELECT = "id,displayName,mailNickname,mail"
+    _GROUP_SELECT_PARAMS: ClassVar[dict[str, str]] = {"$select": _GROUP_SELECT}
 
     def list_users(self, domain: str) -> list[dict]:
         """Listet alle User einer Domain auf (serverseitig gefiltert).
@@ -169,17 +370,74 @@ class GraphClient:
         Benötigt ConsistencyLevel: eventual (bereits in _request gesetzt)
         und $count=true als Handshake für advanced queries.
         """
-        domain_suffix = f"@{domain}"
-        users = self._request_paged(
+        users = list(self.iter_users(domain))
+        log.debug("list_users: %d mit Domain @%s", len(users), domain)
+        return users
+
+    def list_users_incremental(self, domain: str) -> list[dict]:
+        """Wie list_users, bei Folgeaufrufen im selben Prozess aber per Delta.
+
+        Der erste Aufruf lädt die Domain-User vollständig und merkt sich einen
+        /users/delta-Link; danach werden nur Änderungen abgeholt und in den
+        Stand eingearbeitet. Schlägt das Delta fehl (z.B. 410 Gone bei
+        abgelaufenem Token), wird wieder vollständig geladen.
+        """
+        key = (self._tenant_id, self._client_id, domain.lower())
+        with _user_delta_lock:
+            state = _user_delta_cache.get(key)
+
+        if state:
+            delta_link, cached = state
+            try:
+                changes, new_link = self._collect_delta(delta_link)
+            except GraphApiError as exc:
+                log.info("User-Delta fehlgeschlagen (%s), lade vollständig", exc)
+                new_link = ""
+            if new_link:
+                users = _merge_user_delta(cached, changes, domain)
+                with _user_delta_lock:
+                    _user_delta_cache[key] = (new_link, users)
+                log.debug("list_users: %d Änderungen per Delta", len(changes))
+                return list(users.values())
+
+        # Delta-Link vor dem Laden holen: Änderungen während des Ladens
+        # kommen so beim nächsten Delta an (Merge ist idempotent)
+        try:
+            _, delta_link = self._collect_delta(
+                "/users/delta",
+                {"$select": self._USER_SELECT, "$deltatoken": "latest"},
+            )
+        except GraphApiError as exc:
+            log.info("Kein User-Delta verfügbar: %s", exc)
+            delta_link = ""
+        users = self.list_users(domain)
+        if delta_link:
+            with _user_delta_lock:
+                _user_delta_cache[key] = (delta_link, {u["id"]: u for u in users})
+        return users
+
+    def _collect_delta(
+        self, path: str, params: dict | None = None
+    ) -> tuple[list[dict], str]:
+        """Folgt den nextLinks einer Delta-Abfrage bis zum deltaLink."""
+        items: list[dict] = []
+        resp = self._request("GET", path, params=params)
+        items.extend(resp.get("value", []))
+        while "@odata.nextLink" in resp:
+            resp = self._request("GET", resp["@odata.nextLink"])
+            items.extend(resp.get("value", []))
+        return items, resp.get("@odata.deltaLink", "")
+
+    def iter_users(self, domain: str) -> Iterator[dict]:
+        """Wie list_users, aber als Iterator (hält nur eine Seite im Speicher)."""
+        return self._iter_paged(
             "/users",
             params={
                 "$select": self._USER_SELECT,
-                "$filter": f"endsWith(userPrincipalName,'{domain_suffix}')",
+                "$filter": f"endsWith(userPrincipalName,'@{domain}')",
                 "$count": "true",
             },
         )
-        log.debug("list_users: %d mit Domain %s", len(users), domain_suffix)
-        return users
 
     def create_user(self, user_data: dict) -> dict:
         """Legt einen neuen User an."""
@@ -191,32 +449,61 @@ class GraphClient:
 
     def find_user_by_employee_id(self, employee_id: str) -> dict | None:
         """Sucht einen User anhand seiner employeeId."""
-        results = self._request_paged(
+        return self._request_first(
             "/users",
             params={
                 "$filter": f"employeeId eq '{employee_id}'",
                 "$select": self._USER_SELECT,
             },
         )
-        return results[0] if results else None
 
     def find_user_by_upn(self, upn: str) -> dict | None:
         """Sucht einen User anhand seines UPN (E-Mail)."""
         try:
             return self._request(
-                "GET", f"/users/{upn}", params={"$select": self._USER_SELECT}
+                "GET", f"/users/{upn}", params=self._USER_SELECT_PARAMS
             )
         except GraphApiError as e:
             if e.status_code == 404:
                 return None
             raise
 
+    def find_users_by_upns(self, upns: list[str]) -> dict[str, dict]:
+        """Sucht mehrere User per UPN (Blöcke à 15 per "in", parallel).
+
+        Returns: {upn_lowercase: user} — nicht gefundene UPNs fehlen.
+        """
+        unique = list(dict.fromkeys(u.lower() for u in upns if u))
+        specs: list[tuple[str, dict | None]] = []
+        for start in range(0, len(unique), _FILTER_IN_LIMIT):
+            chunk = unique[start : start + _FILTER_IN_LIMIT]
+            values = ",".join("'" + u.replace("'", "''") + "'" for u in chunk)
+            specs.append(
+                (
+                    "/users",
+                    {
+                        "$select": self._USER_SELECT,
+                        "$filter": f"userPrincipalName in ({values})",
+                        "$count": "true",
+                    },
+                )
+            )
+        return {
+            (u.get("userPrincipalName") or "").lower(): u
+            for users in self.fetch_many(specs)
+            for u in users
+        }
+
     # --- Lizenzen ---
 
     def list_skus(self) -> list[dict]:
-        """Listet alle verfügbaren Lizenz-SKUs."""
-        resp = self._request("GET", "/subscribedSkus")
-        return resp.get("value", [])
+        """Listet alle verfügbaren Lizenz-SKUs (10 Minuten gecached)."""
+        now = time.monotonic()
+        if self._skus is None or now - self._skus_fetched > _SKU_CACHE_TTL:
+            resp = self._request("GET", "/subscribedSkus")
+            self._skus = resp.get("value", [])
+            self._skus_fetched = now
+        return self._skus
 
     def assign_license(self, user_id: str, sku_id: str) -> dict:
         """Weist einem User eine Lizenz zu."""
@@ -231,38 +518,71 @@ class GraphClient:
 
     # --- Gruppen ---
 
-    def list_groups(self, prefix: str) -> list[dict]:
-        """Listet Gruppen die mit prefix beginnen (serverseitig gefiltert).
-
-        Nutzt $filter=startsWith (advanced query) statt alle Gruppen zu laden.
-        """
+    @classmethod
+    def _groups_prefix_query(cls, prefix: str) -> tuple[str, dict]:
+        """(path, params) für Gruppen mit displayName-Prefix."""
         safe_prefix = prefix.replace("'", "''")
-        return self._request_paged(
+        return (
             "/groups",
-            params={
-                "$select": "id,displayName,mailNickname,mail",
+            {
+                "$select": cls._GROUP_SELECT,
                 "$filter": f"startsWith(displayName,'{safe_prefix}')",
                 "$count": "true",
             },
         )
 
+    def list_groups(self, prefix: str) -> list[dict]:
+        """Listet Gruppen die mit prefix beginnen (serverseitig gefiltert).
+
+        Nutzt $filter=startsWith (advanced query) statt alle Gruppen zu laden.
+        """
+        return self._request_paged(*self._groups_prefix_query(prefix))
+
+    def list_groups_many(self, prefixes: list[str]) -> list[list[dict]]:
+        """Wie list_groups, aber für mehrere Prefixe parallel (fetch_many)."""
+        return self.fetch_many([self._groups_prefix_query(p) for p in prefixes])
+
     def find_group_by_name(self, display_name: str) -> dict | None:
         """Sucht eine Gruppe per exaktem displayName (einfacher Gleichheitsfilter)."""
         safe_name = display_name.replace("'", "''")
-        results = self._request_paged(
+        return self._request_first(
             "/groups",
             params={
-                "$select": "id,displayName,mailNickname,mail",
+                "$select": self._GROUP_SELECT,
                 "$filter": f"displayName eq '{safe_name}'",
             },
         )
-        return results[0] if results else None
+
+    def list_groups_by_names(self, display_names: list[str]) -> list[dict]:
+        """Listet Gruppen mit exakt diesen displayNames (serverseitig per "in").
+
+        Die Namen werden in Blöcken à 15 abgefragt, die Blöcke parallel.
+        """
+        names = list(dict.fromkeys(display_names))
+        specs: list[tuple[str, dict | None]] = []
+        for start in range(0, len(names), _FILTER_IN_LIMIT):
+            chunk = names[start : start + _FILTER_IN_LIMIT]
+            values = ",".join("'" + n.replace("'", "''") + "'" for n in chunk)
+            specs.append(
+                (
+                    "/groups",
+                    {
+                        "$select": self._GROUP_SELECT,
+                        "$filter": f"displayName in ({values})",
+                        "$count": "true",
+                    },
+                )
+            )
+        return [g for groups in self.fetch_many(specs) for g in groups]
 
     def list_all_groups(self) -> list[dict]:
-        """Listet ALLE Gruppen im Tenant (für client-seitige Filterung)."""
+        """Listet ALLE Gruppen im Tenant (für client-seitige Filterung).
+
+        Veraltet: list_groups (Prefix) bzw. list_groups_by_names nutzen.
+        """
         return self._request_paged(
             "/groups",
-            params={"$select": "id,displayName,mailNickname,mail"},
+            params=self._GROUP_SELECT_PARAMS,
         )
 
     def get_group(self, group_id: str) -> dict | None:
@@ -282,21 +602,58 @@ class GraphClient:
         """Erstellt eine neue Gruppe."""
         return self._request("POST", "/groups", json=group_data)
 
+    _MEMBER_SELECT = "id,employeeId,userPrincipalName"
+
     def get_members(self, group_id: str) -> list[dict]:
         """Listet alle Mitglieder einer Gruppe."""
         return self._request_paged(
             f"/groups/{group_id}/members",
-            params={"$select": "id,employeeId,userPrincipalName"},
+            params={"$select": self._MEMBER_SELECT},
         )
 
+    def get_members_many(self, group_ids: list[str]) -> dict[str, list[dict]]:
+        """Listet die Mitglieder mehrerer Gruppen per $batch (20 pro Request).
+
+        Folgeseiten und fehlgeschlagene Teil-Requests werden einzeln
+        nachgeladen. Returns: {group_id: [member, ...]}
+        """
+        ids = list(dict.fromkeys(group_ids))
+        responses = self.batch_many(
+            [
+                {
+                    "id": str(idx),
+                    "method": "GET",
+                    "url": f"/groups/{gid}/members"
+                    f"?$select={self._MEMBER_SELECT}&$top=999",
+                }
+                for idx, gid in enumerate(ids)
+            ]
+        )
+        members: dict[str, list[dict]] = {}
+        for idx, gid in enumerate(ids):
+            resp = responses.get(str(idx), {})
+            if resp.get("status") != 200:
+                # Normale Fehlerbehandlung (inkl. Retry) über Einzelabfrage
+                members[gid] = self.get_members(gid)
+                continue
+            body = resp.get("body") or {}
+            found = list(body.get("value", []))
+            if "@odata.nextLink" in body:
+                found.extend(self._iter_paged(body["@odata.nextLink"]))
+            members[gid] = found
+        return members
+
+    @staticmethod
+    def member_ref(user_id: str) -> dict:
+        """Body für .../members/$ref bzw. .../owners/$ref."""
+        return {"@odata.id": _DIRECTORY_OBJECT_URL + user_id}
+
     def add_member(self, group_id: str, user_id: str) -> None:
         """Fügt einen User als Mitglied hinzu."""
         self._request(
             "POST",
             f"/groups/{group_id}/members/$ref",
-            json={
-                "@odata.id": f"{_GRAPH_BASE}/directoryObjects/{user_id}",
-            },
+            json=self.member_ref(user_id),
         )
 
     def remove_member(self, group_id: str, user_id: str) -> None:
@@ -308,9 +665,7 @@ class GraphClient:
         self._request(
             "POST",
             f"/groups/{group_id}/owners/$ref",
-            json={
-                "@odata.id": f"{_GRAPH_BASE}/directoryObjects/{user_id}",
-            },
+            json=self.member_ref(user_id),
         )
 
     # --- Batch ---
@@ -338,3 +693,85 @@ class GraphClient:
         payload = {"requests": requests_list}
         resp = self._request("POST", "/$batch", json=payload)
         return resp.get("responses", [])
+
+    def batch_many(self, requests_list: list[dict]) -> dict[str, dict]:
+        """Sendet beliebig viele Requests in Batches à 20.
+
+        Gedrosselte Teil-Requests (429) werden einzeln erneut gebatcht.
+        Gibt {request_id: response} zurück — Graph darf die Reihenfolge
+        innerhalb eines Batches ändern, daher Zuordnung über die ID.
+        """
+        responses: dict[str, dict] = {}
+        pending = list(requests_list)
+        for attempt in range(_MAX_RETRIES):
+            throttled: list[dict] = []
+            retry_after: float | None = None
+            by_id = {req["id"]: req for req in pending}
+            for start in range(0, len(pending), self._BATCH_LIMIT):
+                chunk = pending[start : start + self._BATCH_LIMIT]
+                for resp in self.batch(chunk):
+                    if resp.get("status") == 429 and resp["id"] in by_id:
+                        throttled.append(by_id[resp["id"]])
+                        wait = _parse_retry_after(
+                            (resp.get("headers") or {}).get("Retry-After")
+                        )
+                        if wait is not None:
+                            retry_after = max(retry_after or 0.0, wait)
+                    responses[resp["id"]] = resp
+            if not throttled or attempt + 1 == _MAX_RETRIES:
+                break
+            delay = _backoff_delay(attempt, retry_after)
+            log.warning(
+                "Batch: %d gedrosselte Requests, Retry nach %.1fs",
+                len(throttled),
+                delay,
+            )
+            time.sleep(delay)
+            pending = throttled
+        return responses
+
+    def _bulk_by_user(
+        self, user_ids: list[str], build: Callable[[str], dict]
+    ) -> dict[str, dict]:
+        """Baut pro User einen Batch-Request und liefert {user_id: response}."""
+        requests_list = [
+            {"id": str(idx), **build(uid)} for idx, uid in enumerate(user_ids)
+        ]
+        responses = self.batch_many(requests_list)
+        return {uid: responses.get(str(idx), {}) for idx, uid in enumerate(user_ids)}
+
+    def add_members_bulk(self, group_id: str, user_ids: list[str]) -> dict[str, dict]:
+        """Fügt mehrere User per $batch als Mitglieder hinzu."""
+        return self._bulk_by_user(
+            user_ids,
+            lambda uid: {
+                "method": "POST",
+                "url": f"/groups/{group_id}/members/$ref",
+                "headers": {"Content-Type": "application/json"},
+                "body": self.member_ref(uid),
+            },
+        )
+
+    def remove_members_bulk(
+        self, group_id: str, user_ids: list[str]
+    ) -> dict[str, dict]:
+        """Entfernt mehrere Mitglieder per $batch aus einer Gruppe."""
+        return self._bulk_by_user(
+            user_ids,
+            lambda uid: {
+                "method": "DELETE",
+                "url": f"/groups/{group_id}/members/{uid}/$ref",
+            },
+        )
+
+    def assign_license_bulk(self, user_ids: list[str], sku_id: str) -> dict[str, dict]:
+        """Weist mehreren Usern per $batch dieselbe Lizenz zu."""
+        return self._bulk_by_user(
+            user_ids,
+            lambda uid: {
+                "method": "POST",
+                "url": f"/users/{uid}/assignLicense",
+                "headers": {"Content-Type": "application/json"},
+                "body": {"addLicenses": [{"skuId": sku_id}], "removeLicenses": []},
+            },
+        )
@@ -3,7 +3,7 @@ from __future__ import annotations
 from dataclasses import dataclass, field
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class CourseAssignment:
     """Fach-/Kurszuordnung eines Schülers."""
 
@@ -17,7 +17,7 @@ class CourseAssignment:
     teacher_email: str = ""  # EMailDienstlich des FachLehrers
 
 
-@dataclass
+@dataclass(slots=True)
 class StudentRecord:
     """Einheitliches Schüler-Format (Output aller Adapter)."""
 
@@ -44,7 +44,7 @@ class StudentRecord:
     courses: list[CourseAssignment] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class TeacherRecord:
     """Einheitliches Lehrer-Format (Output aller Adapter)."""
 
@@ -60,7 +60,7 @@ class TeacherRecord:
         return f"{self.last_name}|{self.dob}"
 
 
-@dataclass
+@dataclass(slots=True)
 class ChangeSet:
     """Ergebnis der Diff-Berechnung zwischen Quelle und Zielsystem."""
 
@@ -76,7 +76,7 @@ class ChangeSet:
     requires_force: bool = False
 
 
-@dataclass
+@dataclass(slots=True)
 class SyncResult:
     """Ergebnis eines Plugin-Apply-Aufrufs."""
 
@@ -86,7 +86,7 @@ class SyncResult:
     message: str = ""
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class ConfigField:
     """Beschreibt ein Konfigurationsfeld eines Plugins."""
 
@@ -3,14 +3,53 @@
 from __future__ import annotations
 
 import logging
+import random
+import threading
+import time
+from collections.abc import Iterator
+from concurrent.futures import ThreadPoolExecutor
+from json import loads as _json_loads
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
 
 log = logging.getLogger(__name__)
 
-# Retry bei Server-Fehlern (5xx)
+# Retry bei Server-Fehlern (5xx) und Netzwerkfehlern
 _MAX_RETRIES = 3
+_BACKOFF_BASE = 0.5  # Sekunden, verdoppelt pro Versuch
+_MAX_BACKOFF = 10.0
+
+# Max. Einträge pro Bulk-Aufruf (create_users, enrol_users, ...) — größere
+# Listen werden auf mehrere Requests verteilt
+_BATCH_SIZE = 200
+
+# Circuit Breaker: nach so vielen Ausfällen in Folge (Netzwerk/5xx nach allen
+# Retries) schlagen Aufrufe sofort fehl, bis die Wartezeit um ist
+_CB_THRESHOLD = 5
+_CB_RESET_SECONDS = 30.0
+
+# Antwort-Cache für reine Lesefunktionen (pro Client-Instanz); jeder
+# schreibende Aufruf leert ihn komplett
+_READ_ONLY_FUNCTIONS = frozenset(
+    {
+        "core_webservice_get_site_info",
+        "core_course_get_categories",
+        "core_user_get_users",
+        "core_user_get_users_by_field",
+        "core_course_get_courses_by_field",
+        "core_enrol_get_enrolled_users",
+    }
+)
+_CACHE_TTL = 60.0  # Sekunden
+
+# Parallele Aufrufe in map_calls
+_MAP_WORKERS = 8
+
+# Verbindungen pro Host im Keep-Alive-Pool (auch für parallele Aufrufe)
+_POOL_SIZE = 32
 
 
 class MoodleApiError(Exception):
@@ -21,13 +60,51 @@ class MoodleApiError(Exception):
         super().__init__(f"Moodle API [{errorcode}]: {message}")
 
 
+def _backoff_delay(attempt: int, retry_after: str | None) -> float:
+    """Exponentielles Backoff mit Jitter; Retry-After (Sekunden) hat Vorrang."""
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), _MAX_BACKOFF)
+    delay = min(_MAX_BACKOFF, _BACKOFF_BASE * 2**attempt)
+    return delay * random.uniform(0.5, 1.5)
+
+
+def _not_sent(exc: requests.RequestException) -> bool:
+    """True, wenn der Request den Server sicher nicht erreicht hat.
+
+    Verbindungsaufbau gescheitert (Timeout, abgewiesen, DNS) → gefahrlos
+    wiederholbar; alles andere (Read-Timeout, Abbruch mitten im Request)
+    ist unklar.
+    """
+    if isinstance(exc, requests.ConnectTimeout):
+        return True
+    reason = exc.args[0] if exc.args else None
+    # requests verpackt urllib3s MaxRetryError; die Ursache steht in .reason
+    return isinstance(getattr(reason, "reason", reason), NewConnectionError)
+
+
 class MoodleClient:
     """HTTP-Client für Moodle Web Services (Token-basiert)."""
 
     def __init__(self, base_url: str, token: str) -> None:
         self._base_url = base_url.rstrip("/")
+        # Endpunkt ist für alle Funktionen gleich → einmal zusammensetzen
+        self._url = f"{self._base_url}/webservice/rest/server.php"
         self._token = token
         self._session = requests.Session()
+        # Ein Host, viele Requests: großer Pool, damit auch parallele Aufrufe
+        # ihre TCP/TLS-Verbindung wiederverwenden statt neu aufzubauen
+        adapter = HTTPAdapter(pool_maxsize=_POOL_SIZE)
+        self._session.mount("https://", adapter)
+        self._session.mount("http://", adapter)
+        # Circuit Breaker: "closed" (normal), "open" (sofort Fehler),
+        # "half_open" (ein Probe-Aufruf entscheidet); map_calls teilt den
+        # Zustand zwischen Threads → nur unter _cb_lock ändern
+        self._cb_lock = threading.Lock()
+        self._cb_state = "closed"
+        self._cb_failures = 0
+        self._cb_opened_at = 0.0
+        # (function, params) → (Zeitpunkt, Antwort); Antworten nicht verändern
+        self._cache: dict[tuple, tuple[float, Any]] = {}
 
     # --- HTTP-Kern ---
 
@@ -38,41 +115,91 @@ class MoodleClient:
         Moodle erwartet Array-Parameter als:
         users[0][username]=john&users[0][firstname]=John
         """
+        # Häufigster Fall (get_courses_by_field, get_enrolled_users, ...):
+        # nur skalare Werte → ohne Stack direkt umwandeln
+        if not prefix and not any(isinstance(v, (dict, list)) for v in params.values()):
+            return {str(k): str(v) for k, v in params.items()}
+
         flat: dict[str, str] = {}
-        for key, value in params.items():
-            full_key = f"{prefix}[{key}]" if prefix else str(key)
-            if isinstance(value, dict):
-                flat.update(MoodleClient._flatten_params(value, full_key))
-            elif isinstance(value, list):
-                for i, item in enumerate(value):
-                    idx_key = f"{full_key}[{i}]"
-                    if isinstance(item, dict):
-                        flat.update(MoodleClient._flatten_params(item, idx_key))
-                    else:
-                        flat[idx_key] = str(item)
-            else:
+        # Iterativ statt rekursiv: Stack aus (Iterator, Prefix, ist_Liste),
+        # Tiefensuche in Eingabereihenfolge, ein einziges Ergebnis-Dict
+        stack: list[tuple[Iterator, str, bool]] = [
+            (iter(params.items()), prefix, False)
+        ]
+        while stack:
+            items, cur_prefix, in_list = stack[-1]
+            for key, value in items:
+                if in_list:
+                    full_key = f"{cur_prefix}[{key}]"
+                    if isinstance(value, dict):
+                        stack.append((iter(value.items()), full_key, False))
+                        break
+                else:
+                    full_key = f"{cur_prefix}[{key}]" if cur_prefix else str(key)
+                    if isinstance(value, dict):
+                        stack.append((iter(value.items()), full_key, False))
+                        break
+                    if isinstance(value, list):
+                        stack.append((iter(enumerate(value)), full_key, True))
+                        break
                 flat[full_key] = str(value)
+            else:
+                stack.pop()
         return flat
 
     def _call(self, function: str, **params: Any) -> Any:
         """Ruft eine Moodle Web Service Funktion auf."""
-        url = f"{self._base_url}/webservice/rest/server.php"
-
-        # Basis-Parameter
-        base = {
-            "wstoken": self._token,
-            "wsfunction": function,
-            "moodlewsrestformat": "json",
-        }
+        # Verschachtelte Parameter flach machen und die Basis-Parameter
+        # direkt ergänzen — ein Dict pro Aufruf statt zwei plus Merge
+        post_data = self._flatten_params(params)
+        log.debug("Moodle API: %s (%d params)", function, len(post_data))
+        cache_key = (
+            (function, tuple(post_data.items()))
+            if function in _READ_ONLY_FUNCTIONS
+            else None
+        )
+        post_data.setdefault("wstoken", self._token)
+        post_data.setdefault("wsfunction", function)
+        post_data.setdefault("moodlewsrestformat", "json")
+
+        if cache_key is not None:
+            cached = self._cache.get(cache_key)
+            if cached and time.monotonic() - cached[0] < _CACHE_TTL:
+                log.debug("Moodle API: %s aus Cache", function)
+                return cached[1]
+            data = self._call_uncached(post_data)
+            self._cache[cache_key] = (time.monotonic(), data)
+            return data
 
-        # Verschachtelte Parameter flach machen
-        flat = self._flatten_params(params)
-        post_data = {**base, **flat}
+        # Schreibender Aufruf → gecachte Lesedaten können veraltet sein
+        self._cache.clear()
+        return self._call_uncached(post_data)
 
-        log.debug("Moodle API: %s (%d params)", function, len(flat))
+    def _call_uncached(self, post_data: dict) -> Any:
+        """Sendet den Request (mit Retry und Circuit Breaker).
 
+        Lesefunktionen werden bei Netzwerk- und Server-Fehlern wiederholt.
+        Schreibende Funktionen nur, wenn der Request den Server sicher nicht
+        erreicht hat — nach Read-Timeout oder 5xx kann er schon ausgeführt
+        sein, eine Wiederholung würde dann als Duplikat abgelehnt.
+        """
+        self._check_circuit()
+        read_only = post_data.get("wsfunction") in _READ_ONLY_FUNCTIONS
         for attempt in range(_MAX_RETRIES):
-            resp = self._session.post(url, data=post_data, timeout=30)
+            try:
+                resp = self._session.post(self._url, data=post_data, timeout=30)
+            except (requests.ConnectionError, requests.Timeout) as exc:
+                log.warning(
+                    "Moodle nicht erreichbar: %s (Versuch %d/%d)",
+                    exc,
+                    attempt + 1,
+                    _MAX_RETRIES,
+                )
+                if attempt < _MAX_RETRIES - 1 and (read_only or _not_sent(exc)):
+                    time.sleep(_backoff_delay(attempt, None))
+                    continue
+                self._record_failure()
+                raise
 
             if resp.status_code >= 500:
                 log.warning(
@@ -81,18 +208,25 @@ class MoodleClient:
                     attempt + 1,
                     _MAX_RETRIES,
                 )
-                if attempt < _MAX_RETRIES - 1:
+                if attempt < _MAX_RETRIES - 1 and read_only:
+                    time.sleep(_backoff_delay(attempt, resp.headers.get("Retry-After")))
                     continue
+                self._record_failure()
                 raise MoodleApiError(
                     "http_error", f"HTTP {resp.status_code}: {resp.text[:200]}"
                 )
 
+            # Server antwortet → Breaker zurücksetzen (auch bei Fachfehlern)
+            self._record_success()
+
             if resp.status_code != 200:
                 raise MoodleApiError(
                     "http_error", f"HTTP {resp.status_code}: {resp.text[:200]}"
                 )
 
-            data = resp.json()
+            # Bytes direkt parsen: spart requests' Encoding-Erkennung und
+            # die Dekodierung großer Antworten (Einschreibungen) zu str
+            data = _json_loads(resp.content)
 
             # Moodle gibt Fehler als JSON-Objekt mit "exception" zurück
             if isinstance(data, dict) and "exception" in data:
@@ -105,6 +239,90 @@ class MoodleClient:
 
         raise MoodleApiError("max_retries", "Maximale Versuche erreicht")
 
+    def map_calls(
+        self, specs: list[tuple[str, dict]], return_exceptions: bool = False
+    ) -> list[Any]:
+        """Führt unabhängige Aufrufe parallel aus (Thread-Pool).
+
+        specs: [(function, params), ...] — Ergebnisse in derselben Reihenfolge.
+        Mit return_exceptions=True stehen Fehler als Exception-Objekt im
+        Ergebnis, statt den ersten Fehler zu werfen.
+        """
+
+        def run(spec: tuple[str, dict]) -> Any:
+            function, params = spec
+            if not return_exceptions:
+                return self._call(function, **params)
+            try:
+                return self._call(function, **params)
+            except (MoodleApiError, requests.RequestException) as exc:
+                return exc
+
+        if len(specs) <= 1:
+            return [run(spec) for spec in specs]
+        with ThreadPoolExecutor(max_workers=min(_MAP_WORKERS, len(specs))) as pool:
+            return list(pool.map(run, specs))
+
+    def _check_circuit(self) -> None:
+        """Wirft sofort, solange der Breaker offen ist.
+
+        Nach der Wartezeit darf genau ein Thread (der umschaltet) den
+        Probe-Aufruf senden; alle anderen werfen weiter, bis er entschieden
+        hat. Bleibt die Probe ohne Ergebnis, wird sie nach der Wartezeit
+        neu vergeben.
+        """
+        with self._cb_lock:
+            if self._cb_state == "closed":
+                return
+            now = time.monotonic()
+            if now - self._cb_opened_at < _CB_RESET_SECONDS:
+                if self._cb_state == "half_open":
+                    raise MoodleApiError(
+                        "circuit_open",
+                        "Moodle-Verbindung wird gerade erneut geprüft",
+                    )
+                raise MoodleApiError(
+                    "circuit_open",
+                    f"Moodle nach {self._cb_failures} Fehlern in Folge nicht "
+                    f"erreichbar — neuer Versuch in {_CB_RESET_SECONDS:.0f}s",
+                )
+            self._cb_state = "half_open"
+            self._cb_opened_at = now
+
+    def _record_failure(self) -> None:
+        with self._cb_lock:
+            self._cb_failures += 1
+            if self._cb_state == "half_open" or self._cb_failures >= _CB_THRESHOLD:
+                if self._cb_state != "open":
+                    log.warning(
+                        "Moodle: %d Fehler in Folge, Aufrufe pausieren %.0fs",
+                        self._cb_failures,
+                        _CB_RESET_SECONDS,
+                    )
+                self._cb_state = "open"
+                self._cb_opened_at = time.monotonic()
+
+    def _record_success(self) -> None:
+        with self._cb_lock:
+            self._cb_state = "closed"
+            self._cb_failures = 0
+
+    def _call_batched(
+        self, function: str, key: str, items: list, **params: Any
+    ) -> list:
+        """Ruft function mit items in Blöcken à _BATCH_SIZE auf.
+
+        Listen-Ergebnisse der Blöcke werden aneinandergehängt. Leere items
+        lösen keinen Request aus.
+        """
+        results: list = []
+        for start in range(0, len(items), _BATCH_SIZE):
+            chunk = items[start : start + _BATCH_SIZE]
+            data = self._call(function, **{key: chunk}, **params)
+            if isinstance(data, list):
+                results.extend(data)
+        return results
+
     # --- Verbindungstest ---
 
     def get_site_info(self) -> dict:
@@ -125,15 +343,17 @@ class MoodleClient:
         """Holt User anhand eines Feldes (id, idnumber, username, email)."""
         if not values:
             return []
-        return self._call("core_user_get_users_by_field", field=field, values=values)
+        return self._call_batched(
+            "core_user_get_users_by_field", "values", values, field=field
+        )
 
     def create_users(self, users: list[dict]) -> list[dict]:
         """Legt neue User an. Returns: Liste mit {id, username}."""
-        return self._call("core_user_create_users", users=users)
+        return self._call_batched("core_user_create_users", "users", users)
 
     def update_users(self, users: list[dict]) -> None:
         """Aktualisiert bestehende User (id muss gesetzt sein)."""
-        self._call("core_user_update_users", users=users)
+        self._call_batched("core_user_update_users", "users", users)
 
     # --- Kategorien ---
 
@@ -145,6 +365,8 @@ class MoodleClient:
 
     def create_categories(self, categories: list[dict]) -> list[dict]:
         """Erstellt Kategorien. Returns: Liste mit {id, name}."""
+        if not categories:
+            return []
         return self._call("core_course_create_categories", categories=categories)
 
     # --- Kurse ---
@@ -158,6 +380,8 @@ class MoodleClient:
 
     def create_courses(self, courses: list[dict]) -> list[dict]:
         """Erstellt Kurse. Returns: Liste mit {id, shortname}."""
+        if not courses:
+            return []
         return self._call("core_course_create_courses", courses=courses)
 
     def duplicate_course(
@@ -190,11 +414,11 @@ class MoodleClient:
 
         enrolments: [{"roleid": 5, "userid": 42, "courseid": 789}]
         """
-        self._call("enrol_manual_enrol_users", enrolments=enrolments)
+        self._call_batched("enrol_manual_enrol_users", "enrolments", enrolments)
 
     def unenrol_users(self, enrolments: list[dict]) -> None:
         """Meldet User von Kursen ab.
 
         enrolments: [{"userid": 42, "courseid": 789}]
         """
-        self._call("enrol_manual_unenrol_users", enrolments=enrolments)
+        self._call_batched("enrol_manual_unenrol_users", "enrolments", enrolments)
@@ -7,10 +7,12 @@ Bei normaler Ausführung wird stattdessen das Projektverzeichnis verwendet.
 
 from __future__ import annotations
 
+import functools
 import sys
 from pathlib import Path
 
 
+@functools.lru_cache(maxsize=1)
 def _base_dir() -> Path:
     """Gibt das Basisverzeichnis zurück — entweder das PyInstaller-
     Temp-Verzeichnis (``sys._MEIPASS``) oder das Projektverzeichnis."""
@@ -1,10 +1,15 @@
 from __future__ import annotations
 
+import functools
 import importlib
 import json
+import os
+from collections.abc import Mapping
 from pathlib import Path
+from types import MappingProxyType
 
 from adapters.base import AdapterBase
+from core.models import ConfigField
 from plugins.base import PluginBase
 
 # --- Registries ---
@@ -22,14 +27,19 @@ _PLUGIN_REGISTRY: dict[str, tuple[str, str]] = {
     "webuntis": ("plugins.webuntis", "WebUntisPlugin"),
 }
 
+# Schreibgeschützte Sichten für die Getter — keine Kopie pro Aufruf
+_ADAPTER_VIEW = MappingProxyType(_ADAPTER_REGISTRY)
+_PLUGIN_VIEW = MappingProxyType(_PLUGIN_REGISTRY)
+
 
 # --- Adapter ---
 
 
-def get_adapter_registry() -> dict[str, tuple[str, str]]:
-    return dict(_ADAPTER_REGISTRY)
+def get_adapter_registry() -> Mapping[str, tuple[str, str]]:
+    return _ADAPTER_VIEW
 
 
+@functools.cache
 def get_adapter_class(name: str) -> type[AdapterBase] | None:
     if name not in _ADAPTER_REGISTRY:
         return None
@@ -53,10 +63,11 @@ def load_adapter(settings: dict) -> AdapterBase:
 # --- Plugins ---
 
 
-def get_plugin_registry() -> dict[str, tuple[str, str]]:
-    return dict(_PLUGIN_REGISTRY)
+def get_plugin_registry() -> Mapping[str, tuple[str, str]]:
+    return _PLUGIN_VIEW
 
 
+@functools.cache
 def get_plugin_class(name: str) -> type[PluginBase] | None:
     if name not in _PLUGIN_REGISTRY:
         return None
@@ -91,6 +102,34 @@ def load_plugins(settings: dict) -> list[tuple[str, PluginBase]]:
 SETTINGS_VERSION = 9
 
 
+@functools.cache
+def _adapter_defaults(name: str) -> dict:
+    """Feld-Defaults aus dem config_schema eines Adapters (einmal berechnet).
+
+    Nicht verändern — Aufrufer kopieren per ``{**defaults}``.
+    """
+    adapter_class = get_adapter_class(name)
+    if adapter_class is None:
+        return {}
+    return _schema_defaults(adapter_class.config_schema())
+
+
+@functools.cache
+def _plugin_defaults(name: str) -> dict | None:
+    """Feld-Defaults eines Plugins; None wenn das Plugin unbekannt ist."""
+    plugin_class = get_plugin_class(name)
+    if plugin_class is None:
+        return None
+    return _schema_defaults(plugin_class.config_schema())
+
+
+def _schema_defaults(schema: list[ConfigField]) -> dict:
+    defaults: dict = {}
+    for field in schema:
+        defaults.setdefault(field.key, field.default)  # erstes Feld gewinnt
+    return defaults
+
+
 def generate_default_settings(
     school_name: str = "",
     adapter_type: str = "schild_csv",
@@ -106,22 +145,15 @@ def generate_default_settings(
         enabled_plugins = []
 
     # Adapter-Defaults aus dem Schema der gewählten Adapter-Klasse
-    adapter_cfg: dict = {"type": adapter_type}
-    adapter_class = get_adapter_class(adapter_type)
-    if adapter_class is not None:
-        for field in adapter_class.config_schema():
-            adapter_cfg.setdefault(field.key, field.default)
+    adapter_cfg: dict = {"type": adapter_type, **_adapter_defaults(adapter_type)}
 
     # Plugin-Defaults aus den Schemata aller registrierten Plugins
     plugins_cfg: dict = {}
     for key in _PLUGIN_REGISTRY:
-        plugin_class = get_plugin_class(key)
-        if plugin_class is None:
+        defaults = _plugin_defaults(key)
+        if defaults is None:
             continue
-        plugin_entry: dict = {"enabled": key in enabled_plugins}
-        for field in plugin_class.config_schema():
-            plugin_entry.setdefault(field.key, field.default)
-        plugins_cfg[key] = plugin_entry
+        plugins_cfg[key] = {"enabled": key in enabled_plugins, **defaults}
 
     return {
         "settings_version": SETTINGS_VERSION,
@@ -199,7 +231,14 @@ def load_settings(settings_path: str | Path = "settings.json") -> dict:
 
 
 def save_settings(settings: dict, settings_path: str | Path = "settings.json") -> None:
-    """Speichert Settings als JSON. Setzt immer die aktuelle Version."""
+    """Speichert Settings als JSON. Setzt immer die aktuelle Version.
+
+    Schreibt erst in eine temporäre Datei und ersetzt dann atomar — ein
+    Absturz beim Schreiben hinterlässt keine halbe settings.json.
+    """
     settings["settings_version"] = SETTINGS_VERSION
-    with open(settings_path, "w", encoding="utf-8") as f:
+    path = Path(settings_path)
+    tmp_path = path.with_name(path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
         json.dump(settings, f, indent=4, ensure_ascii=False)
+    os.replace(tmp_path, path)
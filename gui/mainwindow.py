@@ -1,8 +1,12 @@
 from __future__ import annotations
 
 import logging
+import os
+import threading
+from collections.abc import Callable
+from pathlib import Path
 
-from PySide6.QtCore import QObject, Qt, QThread, Signal
+from PySide6.QtCore import QObject, Qt, QThreadPool, Signal
 from PySide6.QtWidgets import (
     QFileDialog,
     QHBoxLayout,
@@ -10,11 +14,11 @@ from PySide6.QtWidgets import (
     QLabel,
     QMainWindow,
     QMessageBox,
+    QPlainTextEdit,
     QProgressBar,
     QPushButton,
     QScrollArea,
     QSplitter,
-    QTextEdit,
     QTreeWidget,
     QTreeWidgetItem,
     QVBoxLayout,
@@ -28,20 +32,62 @@ from gui.settings_dialog import SettingsDialog
 from gui.workers import LoadWorker, PluginApplyWorker, PluginComputeWorker
 
 
+_SETTINGS_FILE = Path("settings.json")
+
+
+def _settings_stamp() -> tuple[int, int] | None:
+    """(mtime_ns, Größe) der settings.json, None wenn nicht vorhanden."""
+    try:
+        st = _SETTINGS_FILE.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+# Max. Zeilen im GUI-Log; ältere fallen heraus (Worker loggen zusätzlich
+# in spider.log)
+_LOG_MAX_LINES = 5000
+
+
+def _class_info(student: dict) -> str:
+    """Detail-Spalte der Vorschau: Klasse und ggf. Email."""
+    info = f"Klasse: {student['class_name']}"
+    email = (student.get("email") or "").strip()
+    return f"{info} | {email}" if email else info
+
+
 # ---------------------------------------------------------------------------
 # Log-Handler → GUI
 # ---------------------------------------------------------------------------
 
 
 class _LogSignalBridge(QObject):
-    """Brücke: nimmt Log-Nachrichten per Signal entgegen (thread-safe).
+    """Brücke: sammelt Log-Nachrichten aus beliebigen Threads (thread-safe).
 
-    Qt-Signals werden automatisch als QueuedConnection ausgeführt wenn
-    Sender und Empfänger in verschiedenen Threads laufen. Dadurch wird
-    der QTextEdit-Zugriff immer im Main-Thread ausgeführt.
+    post() legt nur in einen Puffer; ein Signal gibt es nur, wenn der Puffer
+    vorher leer war. Der Empfänger (QueuedConnection → immer Main-Thread)
+    holt per take() alles auf einmal ab — ein Event und ein Repaint pro
+    Schwall statt pro Zeile.
     """
 
-    message = Signal(str)
+    ready = Signal()
+
+    def __init__(self) -> None:
+        super().__init__()
+        self._lock = threading.Lock()
+        self._pending: list[str] = []
+
+    def post(self, msg: str) -> None:
+        with self._lock:
+            self._pending.append(msg)
+            if len(self._pending) > 1:
+                return  # Signal für diesen Schwall ist schon unterwegs
+        self.ready.emit()
+
+    def take(self) -> list[str]:
+        with self._lock:
+            pending, self._pending = self._pending, []
+        return pending
 
 
 class _QtLogHandler(logging.Handler):
@@ -53,7 +99,7 @@ class _QtLogHandler(logging.Handler):
 
     def emit(self, record: logging.LogRecord) -> None:
         msg = self.format(record)
-        self._bridge.message.emit(msg)
+        self._bridge.post(msg)
 
 
 # ---------------------------------------------------------------------------
@@ -72,9 +118,16 @@ class MainWindow(QMainWindow):
         self._teachers: list[TeacherRecord] = []
         self._plugin_cards: dict[str, PluginCard] = {}
         self._selected_card_key: str | None = None
-        self._worker: object | None = None
-        self._worker_thread: QThread | None = None
+        # Ein Pool für alle Worker statt neuem QThread pro Klick
+        self._pool = QThreadPool(self)
+        self._pool.setMaxThreadCount(max(2, os.cpu_count() or 1))
+        # Signals-Objekte laufender Worker (die Runnables gehören dem Pool)
+        self._load_signals: QObject | None = None
+        # Laufende Plugin-Worker: höchstens einer pro Plugin, verschiedene
+        # Plugins rechnen/schreiben parallel (Zeit = langsamstes statt Summe)
+        self._plugin_signals: dict[str, QObject] = {}
         self._pending_write_back: list[dict] = []
+        self._settings_stamp: tuple[int, int] | None = None
 
         self._build_ui()
         self._load_settings()
@@ -167,14 +220,19 @@ class MainWindow(QMainWindow):
         right_splitter.addWidget(preview)
 
         # Log
-        self._log = QTextEdit()
+        # Reiner Text statt Rich-Text: echtes Anhängen ohne HTML-Parsing,
+        # älteste Zeilen fallen bei langen Sitzungen automatisch heraus
+        self._log = QPlainTextEdit()
         self._log.setReadOnly(True)
+        self._log.setMaximumBlockCount(_LOG_MAX_LINES)
         self._log.setStyleSheet("font-family: monospace; font-size: 12px;")
         right_splitter.addWidget(self._log)
 
         # Python-Logging → GUI-Log weiterleiten (thread-safe via Qt-Signal)
         self._log_bridge = _LogSignalBridge()
-        self._log_bridge.message.connect(self._log_msg)
+        self._log_bridge.ready.connect(
+            self._flush_log, Qt.ConnectionType.QueuedConnection
+        )
         self._log_handler = _QtLogHandler(self._log_bridge)
         self._log_handler.setFormatter(logging.Formatter("[%(name)s] %(message)s"))
         self._log_handler.setLevel(logging.DEBUG)
@@ -192,13 +250,20 @@ class MainWindow(QMainWindow):
 
     # --- Settings ---
 
-    def _load_settings(self) -> None:
+    def _load_settings(self, force: bool = False) -> None:
+        # Unveränderte settings.json nicht erneut lesen (z.B. auf Netzlaufwerk)
+        stamp = _settings_stamp()
+        if not force and stamp is not None and stamp == self._settings_stamp:
+            return
         try:
-            self._settings = load_settings()
+            self._settings = load_settings(_SETTINGS_FILE)
+            # Nach dem Laden erneut: load_settings() migriert ggf. und speichert
+            self._settings_stamp = _settings_stamp()
             school = self._settings.get("school_name", "Unbekannt")
             self._lbl_school.setText(f"Schule: {school}")
             self._log_msg(f"Settings geladen. Schule: {school}")
         except FileNotFoundError:
+            self._settings_stamp = None
             self._log_msg("settings.json nicht gefunden. Bitte konfigurieren.")
 
     def _open_settings_dialog(self) -> None:
@@ -215,7 +280,7 @@ class MainWindow(QMainWindow):
             )
 
     def _on_settings_changed(self) -> None:
-        self._load_settings()
+        self._load_settings(force=True)
         self._populate_plugin_cards()
 
     # --- Plugin-Cards ---
@@ -288,20 +353,15 @@ class MainWindow(QMainWindow):
         self._btn_load.setEnabled(False)
         self._progress.show()
 
-        thread = QThread()
         worker = LoadWorker(self._settings)
-        worker.moveToThread(thread)
-
-        thread.started.connect(worker.run)
-        worker.log_signal.connect(self._log_msg)
-        worker.finished.connect(self._on_load_done)
-        worker.error.connect(self._on_load_error)
-        worker.finished.connect(thread.quit)
-        worker.error.connect(thread.quit)
+        worker.signals.log_signal.connect(
+            self._log_bridge.post, Qt.ConnectionType.DirectConnection
+        )
+        worker.signals.finished.connect(self._on_load_done)
+        worker.signals.error.connect(self._on_load_error)
+        worker.signals.done.connect(self._release_load_worker)
 
-        self._worker = worker
-        self._worker_thread = thread
-        thread.start()
+        self._load_signals = self._start_worker(worker)
 
     def _on_load_done(self, students: list, teachers: list) -> None:
         self._progress.hide()
@@ -330,7 +390,7 @@ class MainWindow(QMainWindow):
 
     def _on_plugin_compute(self, plugin_key: str) -> None:
         self._on_card_selected(plugin_key)
-        if self._is_busy():
+        if self._is_loading() or plugin_key in self._plugin_signals:
             return
         if not self._students:
             self._log_msg("Keine Quelldaten geladen. Bitte zuerst 'Quelldaten laden'.")
@@ -339,7 +399,8 @@ class MainWindow(QMainWindow):
         card = self._plugin_cards[plugin_key]
         card.state = PluginCardState.COMPUTING
         card.excluded_ids = set()
-        self._disable_all_actions()
+        # Nur globale Aktionen sperren — andere Plugins bleiben bedienbar
+        self._disable_global_actions()
         self._progress.show()
 
         plugin_class = get_plugin_class(plugin_key)
@@ -354,8 +415,9 @@ class MainWindow(QMainWindow):
             )
             if not path:
                 card.state = PluginCardState.IDLE
-                self._enable_all_actions()
-                self._progress.hide()
+                if not self._is_busy():
+                    self._enable_all_actions()
+                    self._progress.hide()
                 return
             setattr(plugin_instance, req["key"], path)
 
@@ -363,7 +425,6 @@ class MainWindow(QMainWindow):
             "max_suspend_percentage", 15.0
         )
 
-        thread = QThread()
         worker = PluginComputeWorker(
             plugin_key,
             plugin_instance,
@@ -371,23 +432,15 @@ class MainWindow(QMainWindow):
             max_suspend,
             teachers=self._teachers,
         )
-        worker.moveToThread(thread)
-
-        thread.started.connect(worker.run)
-        worker.log_signal.connect(self._log_msg)
-        worker.finished.connect(self._on_plugin_compute_done)
-        worker.error.connect(self._on_plugin_worker_error)
-        worker.finished.connect(thread.quit)
-        worker.error.connect(lambda k, m: thread.quit())
+        worker.signals.log_signal.connect(
+            self._log_bridge.post, Qt.ConnectionType.DirectConnection
+        )
+        worker.signals.finished.connect(self._on_plugin_compute_done)
+        worker.signals.error.connect(self._on_plugin_worker_error)
 
-        self._worker = worker
-        self._worker_thread = thread
-        thread.start()
+        self._start_plugin_worker(plugin_key, worker)
 
     def _on_plugin_compute_done(self, plugin_key: str, changeset: ChangeSet) -> None:
-        self._progress.hide()
-        self._enable_all_actions()
-
         card = self._plugin_cards[plugin_key]
         card.changeset = changeset
         card.state = PluginCardState.COMPUTED
@@ -417,7 +470,7 @@ class MainWindow(QMainWindow):
 
     def _on_plugin_apply(self, plugin_key: str) -> None:
         self._on_card_selected(plugin_key)
-        if self._is_busy():
+        if self._is_loading() or plugin_key in self._plugin_signals:
             return
 
         card = self._plugin_cards[plugin_key]
@@ -444,7 +497,8 @@ class MainWindow(QMainWindow):
             return
 
         card.state = PluginCardState.APPLYING
-        self._disable_all_actions()
+        # Wie beim Berechnen: andere Plugins laufen parallel weiter
+        self._disable_global_actions()
         self._progress.show()
 
         filtered_cs = self._build_filtered_changeset(card)
@@ -457,28 +511,17 @@ class MainWindow(QMainWindow):
             plugin_config = self._settings.get("plugins", {}).get(plugin_key, {})
             plugin_instance = plugin_class.from_config(plugin_config)
 
-        thread = QThread()
         worker = PluginApplyWorker(plugin_key, plugin_instance, filtered_cs)
-        worker.moveToThread(thread)
-
-        thread.started.connect(worker.run)
-        worker.log_signal.connect(self._log_msg)
-        worker.write_back_ready.connect(self._on_write_back_ready)
-        worker.error.connect(self._on_plugin_worker_error)
-        worker.finished.connect(thread.quit)
-        worker.error.connect(lambda k, m: thread.quit())
-        # thread.finished statt worker.finished → Thread ist beendet
-        # bevor QMessageBox den Event-Loop blockiert (verhindert Absturz).
-        thread.finished.connect(lambda key=plugin_key: self._on_plugin_apply_done(key))
-
-        self._worker = worker
-        self._worker_thread = thread
-        thread.start()
+        worker.signals.log_signal.connect(
+            self._log_bridge.post, Qt.ConnectionType.DirectConnection
+        )
+        worker.signals.write_back_ready.connect(self._on_write_back_ready)
+        worker.signals.error.connect(self._on_plugin_worker_error)
+        self._start_plugin_worker(
+            plugin_key, worker, on_finished=self._on_plugin_apply_done
+        )
 
     def _on_plugin_apply_done(self, plugin_key: str) -> None:
-        self._progress.hide()
-        self._enable_all_actions()
-
         card = self._plugin_cards.get(plugin_key)
         if card:
             card.state = PluginCardState.APPLIED
@@ -494,17 +537,24 @@ class MainWindow(QMainWindow):
     # --- Vorschau-Tree mit Checkboxen ---
 
     def _refresh_preview(self) -> None:
+        # Massen-Einfügen ohne Zwischen-Repaints → ein Layout-Durchlauf am Ende
+        self._tree.setUpdatesEnabled(False)
         self._tree.blockSignals(True)
+        try:
+            self._fill_preview()
+        finally:
+            self._tree.blockSignals(False)
+            self._tree.setUpdatesEnabled(True)
+
+    def _fill_preview(self) -> None:
         self._tree.clear()
 
         if self._selected_card_key is None:
             self._lbl_preview.setText("Vorschau")
-            self._tree.blockSignals(False)
             return
 
         card = self._plugin_cards.get(self._selected_card_key)
         if card is None or card.changeset is None:
-            self._tree.blockSignals(False)
             return
 
         cs = card.changeset
@@ -538,8 +588,6 @@ class MainWindow(QMainWindow):
         ):
             QTreeWidgetItem(self._tree, ["Keine \u00c4nderungen", "Alles synchron"])
 
-        self._tree.blockSignals(False)
-
     def _add_preview_category(
         self,
         label: str,
@@ -558,19 +606,21 @@ class MainWindow(QMainWindow):
         all_checked = True
         any_checked = False
 
-        for s in items:
+        # Zeilentexte vorab per Comprehension; pro Item dann ein Konstruktor
+        # statt mehrerer setText()-Aufrufe
+        names = [f"{s['last_name']}, {s['first_name']}" for s in items]
+        if show_class:
+            infos = [_class_info(s) for s in items]
+        else:
+            infos = [detail] * len(items)
+        child_flags = QTreeWidgetItem().flags() | Qt.ItemFlag.ItemIsUserCheckable
+
+        # Kinder losgelöst bauen und in einem Schritt einhängen
+        children: list[QTreeWidgetItem] = []
+        for s, name, info in zip(items, names, infos, strict=True):
             sid = s["school_internal_id"]
-            child = QTreeWidgetItem(cat)
-            child.setText(0, f"{s['last_name']}, {s['first_name']}")
-            if show_class:
-                email = (s.get("email") or "").strip()
-                info = f"Klasse: {s['class_name']}"
-                if email:
-                    info += f" | {email}"
-                child.setText(1, info)
-            elif detail:
-                child.setText(1, detail)
-            child.setFlags(child.flags() | Qt.ItemFlag.ItemIsUserCheckable)
+            child = QTreeWidgetItem([name, info])
+            child.setFlags(child_flags)
             child.setData(0, Qt.ItemDataRole.UserRole, sid)
 
             if sid in excluded:
@@ -579,6 +629,8 @@ class MainWindow(QMainWindow):
             else:
                 child.setCheckState(0, Qt.CheckState.Checked)
                 any_checked = True
+            children.append(child)
+        cat.addChildren(children)
 
         if all_checked:
             cat.setCheckState(0, Qt.CheckState.Checked)
@@ -605,8 +657,9 @@ class MainWindow(QMainWindow):
         all_checked = True
         any_checked = False
 
+        children: list[QTreeWidgetItem] = []
         for sid in ids:
-            child = QTreeWidgetItem(cat)
+            child = QTreeWidgetItem()
             child.setText(0, f"ID: {sid}")
             child.setFlags(child.flags() | Qt.ItemFlag.ItemIsUserCheckable)
             child.setData(0, Qt.ItemDataRole.UserRole, sid)
@@ -617,6 +670,8 @@ class MainWindow(QMainWindow):
             else:
                 child.setCheckState(0, Qt.CheckState.Checked)
                 any_checked = True
+            children.append(child)
+        cat.addChildren(children)
 
         if all_checked:
             cat.setCheckState(0, Qt.CheckState.Checked)
@@ -671,8 +726,9 @@ class MainWindow(QMainWindow):
             grp_all_checked = True
             grp_any_checked = False
 
+            children: list[QTreeWidgetItem] = []
             for c in group_changes:
-                child = QTreeWidgetItem(group_item)
+                child = QTreeWidgetItem()
                 child.setFlags(child.flags() | Qt.ItemFlag.ItemIsUserCheckable)
                 child.setData(0, Qt.ItemDataRole.UserRole, c["id"])
 
@@ -695,6 +751,8 @@ class MainWindow(QMainWindow):
                 else:
                     child.setCheckState(0, Qt.CheckState.Checked)
                     grp_any_checked = True
+                children.append(child)
+            group_item.addChildren(children)
 
             if grp_all_checked:
                 group_item.setCheckState(0, Qt.CheckState.Checked)
@@ -887,14 +945,66 @@ class MainWindow(QMainWindow):
             requires_force=cs.requires_force,
         )
 
+    def _start_plugin_worker(
+        self,
+        plugin_key: str,
+        worker: PluginComputeWorker | PluginApplyWorker,
+        on_finished: Callable[[str], None] | None = None,
+    ) -> None:
+        """Startet einen Plugin-Worker im Pool und räumt nach dessen Ende auf.
+
+        on_finished hängt an signals.done statt signals.finished → der
+        Worker ist fertig bevor eine QMessageBox den Event-Loop blockiert,
+        und es läuft auch nach einem Fehler.
+        """
+        worker.signals.done.connect(
+            lambda key=plugin_key: self._release_plugin_worker(key)
+        )
+        if on_finished is not None:
+            worker.signals.done.connect(lambda key=plugin_key: on_finished(key))
+        self._plugin_signals[plugin_key] = self._start_worker(worker)
+
+    def _start_worker(
+        self, worker: LoadWorker | PluginComputeWorker | PluginApplyWorker
+    ) -> QObject:
+        """Übergibt den Worker an den Pool; Returns: sein Signals-Objekt.
+
+        Das Runnable gehört danach dem Pool (autoDelete). Das Signals-Objekt
+        hängt am Fenster und wird erst per deleteLater() im Main-Thread
+        abgeräumt — nie per Python-Referenz, während der Pool-Thread noch
+        in done.emit() steckt.
+        """
+        signals = worker.signals
+        signals.setParent(self)
+        self._pool.start(worker)
+        return signals
+
+    def _release_plugin_worker(self, plugin_key: str) -> None:
+        signals = self._plugin_signals.pop(plugin_key, None)
+        if signals is not None:
+            signals.deleteLater()
+        self._release_if_idle()
+
+    def _release_load_worker(self) -> None:
+        if self._load_signals is not None:
+            self._load_signals.deleteLater()
+            self._load_signals = None
+        self._release_if_idle()
+
+    def _release_if_idle(self) -> None:
+        if not self._is_busy():
+            self._progress.hide()
+            self._enable_all_actions()
+
+    def _is_loading(self) -> bool:
+        return self._load_signals is not None
+
     def _is_busy(self) -> bool:
-        return self._worker_thread is not None and self._worker_thread.isRunning()
+        return self._is_loading() or bool(self._plugin_signals)
 
-    def _disable_all_actions(self) -> None:
+    def _disable_global_actions(self) -> None:
         self._btn_load.setEnabled(False)
         self._btn_settings.setEnabled(False)
-        for card in self._plugin_cards.values():
-            card.set_buttons_enabled(False)
 
     def _enable_all_actions(self) -> None:
         self._btn_load.setEnabled(True)
@@ -903,9 +1013,6 @@ class MainWindow(QMainWindow):
             card.refresh_buttons()
 
     def _on_plugin_worker_error(self, plugin_key: str, msg: str) -> None:
-        self._progress.hide()
-        self._enable_all_actions()
-
         card = self._plugin_cards.get(plugin_key)
         if card:
             if card.state == PluginCardState.COMPUTING:
@@ -917,4 +1024,10 @@ class MainWindow(QMainWindow):
         QMessageBox.critical(self, "Fehler", msg)
 
     def _log_msg(self, msg: str) -> None:
-        self._log.append(msg)
+        # Über den Puffer, damit die Reihenfolge mit Worker-Meldungen stimmt
+        self._log_bridge.post(msg)
+
+    def _flush_log(self) -> None:
+        msgs = self._log_bridge.take()
+        if msgs:
+            self._log.appendPlainText("\n".join(msgs))
@@ -175,11 +175,6 @@ class PluginCard(QFrame):
         self.style().unpolish(self)
         self.style().polish(self)
 
-    def set_buttons_enabled(self, enabled: bool) -> None:
-        """Überschreibt Button-States (z.B. während ein Worker läuft)."""
-        self._btn_compute.setEnabled(enabled)
-        self._btn_apply.setEnabled(enabled)
-
     def refresh_buttons(self) -> None:
         """Setzt Button-States basierend auf dem aktuellen Card-State."""
         self._update_buttons()
@@ -223,14 +218,22 @@ class PluginCard(QFrame):
             return
 
         excluded = self._excluded_ids
-        n_new = sum(1 for s in cs.new if s["school_internal_id"] not in excluded)
-        n_changed = sum(
-            1 for s in cs.changed if s["school_internal_id"] not in excluded
-        )
-        n_suspended = sum(1 for sid in cs.suspended if sid not in excluded)
-        n_photos = sum(
-            1 for s in cs.photo_updates if s["school_internal_id"] not in excluded
-        )
+        if not excluded:
+            # Direkt nach dem Berechnen (häufigster Fall): nichts abgewählt →
+            # Längen reichen, kein Durchlauf über alle Einträge
+            n_new = len(cs.new)
+            n_changed = len(cs.changed)
+            n_suspended = len(cs.suspended)
+            n_photos = len(cs.photo_updates)
+        else:
+            n_new = sum(1 for s in cs.new if s["school_internal_id"] not in excluded)
+            n_changed = sum(
+                1 for s in cs.changed if s["school_internal_id"] not in excluded
+            )
+            n_suspended = sum(1 for sid in cs.suspended if sid not in excluded)
+            n_photos = sum(
+                1 for s in cs.photo_updates if s["school_internal_id"] not in excluded
+            )
 
         parts = []
         if n_new:
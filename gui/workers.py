@@ -1,9 +1,12 @@
 from __future__ import annotations
 
+import contextlib
 import logging
+import threading
 import warnings
+from collections.abc import Callable, Iterator
 
-from PySide6.QtCore import QObject, Signal, Slot
+from PySide6.QtCore import QObject, QRunnable, Signal
 
 from core.engine import compute_changeset
 from core.models import ChangeSet
@@ -12,29 +15,91 @@ from plugins.base import PluginBase
 
 log = logging.getLogger(__name__)
 
+# Warnungen pro Worker-Thread sammeln: warnings.catch_warnings() ändert
+# prozessweiten Zustand und ist nicht thread-safe — Worker laufen aber
+# parallel im Pool
+_warning_capture = threading.local()
 
-class LoadWorker(QObject):
-    """Lädt Schüler- und Lehrerdaten vom konfigurierten Adapter."""
 
-    finished = Signal(list, list)  # (students, teachers)
-    error = Signal(str)
-    log_signal = Signal(str)
+def install_warning_capture() -> None:
+    """Leitet Warnungen in die Sammelliste des laufenden Workers um.
 
-    def __init__(self, settings: dict) -> None:
+    Einmal beim Programmstart aufrufen. Threads ohne aktive Sammlung
+    (z.B. der Main-Thread) geben Warnungen wie bisher aus. Filter "always",
+    damit dieselbe Warnung (z.B. übersprungene CSV-Zeile) bei jedem Laden
+    erneut erscheint.
+    """
+    original = warnings.showwarning
+
+    def showwarning(message, category, filename, lineno, file=None, line=None):
+        caught = getattr(_warning_capture, "caught", None)
+        if caught is None:
+            original(message, category, filename, lineno, file, line)
+            return
+        caught.append(
+            warnings.WarningMessage(message, category, filename, lineno, file, line)
+        )
+
+    warnings.showwarning = showwarning
+    warnings.simplefilter("always")
+
+
+@contextlib.contextmanager
+def _capture_warnings() -> Iterator[list[warnings.WarningMessage]]:
+    """Sammelt Warnungen des aktuellen Threads (siehe install_warning_capture)."""
+    caught: list[warnings.WarningMessage] = []
+    _warning_capture.caught = caught
+    try:
+        yield caught
+    finally:
+        _warning_capture.caught = None
+
+
+class _PoolWorker(QRunnable):
+    """Basis für Worker im QThreadPool des Hauptfensters.
+
+    QRunnable hat keine Signals → sie liegen auf einem eigenen QObject
+    (``self.signals``, lebt im Main-Thread, Emits aus dem Pool-Thread
+    kommen dort gequeued an). ``work`` ist die eigentliche Arbeit;
+    ``done`` feuert danach immer als Letztes, auch nach ``error``.
+    """
+
+    def __init__(self, signals: QObject, work: Callable[[], None]) -> None:
         super().__init__()
-        self.settings = settings
+        self.signals = signals
+        self._work = work
+        # autoDelete bleibt an: der Pool löscht das Runnable erst, wenn run()
+        # vollständig zurückgekehrt ist. Das MainWindow hält nur ``signals``.
 
     def _emit(self, msg: str) -> None:
         """Gibt Meldung ans GUI UND in spider.log aus."""
         log.info(msg)
-        self.log_signal.emit(msg)
+        self.signals.log_signal.emit(msg)
 
-    @Slot()
     def run(self) -> None:
         try:
-            with warnings.catch_warnings(record=True) as caught:
-                warnings.simplefilter("always")
+            self._work()
+        finally:
+            self.signals.done.emit()
+
+
+class LoadWorkerSignals(QObject):
+    finished = Signal(list, list)  # (students, teachers)
+    error = Signal(str)
+    log_signal = Signal(str)
+    done = Signal()
+
+
+class LoadWorker(_PoolWorker):
+    """Lädt Schüler- und Lehrerdaten vom konfigurierten Adapter."""
+
+    def __init__(self, settings: dict) -> None:
+        super().__init__(LoadWorkerSignals(), self._load)
+        self.settings = settings
 
+    def _load(self) -> None:
+        try:
+            with _capture_warnings() as caught:
                 self._emit("Lade Schülerdaten...")
                 adapter = load_adapter(self.settings)
                 students = adapter.load()
@@ -74,19 +139,22 @@ class LoadWorker(QObject):
                 for w in caught:
                     self._emit(f"⚠ {w.message}")
 
-            self.finished.emit(students, teachers)
+            self.signals.finished.emit(students, teachers)
 
         except Exception as exc:
             log.exception("LoadWorker fehlgeschlagen")
-            self.error.emit(str(exc))
-
+            self.signals.error.emit(str(exc))
 
-class PluginComputeWorker(QObject):
-    """Berechnet ein ChangeSet für ein einzelnes Plugin."""
 
+class PluginComputeSignals(QObject):
     finished = Signal(str, ChangeSet)  # (plugin_key, changeset)
     error = Signal(str, str)  # (plugin_key, error_message)
     log_signal = Signal(str)
+    done = Signal()
+
+
+class PluginComputeWorker(_PoolWorker):
+    """Berechnet ein ChangeSet für ein einzelnes Plugin."""
 
     def __init__(
         self,
@@ -96,24 +164,16 @@ class PluginComputeWorker(QObject):
         max_suspend: float,
         teachers: list | None = None,
     ) -> None:
-        super().__init__()
+        super().__init__(PluginComputeSignals(), self._compute)
         self.plugin_key = plugin_key
         self.plugin = plugin
         self.students = students
         self.max_suspend = max_suspend
         self.teachers = teachers or []
 
-    def _emit(self, msg: str) -> None:
-        """Gibt Meldung ans GUI UND in spider.log aus."""
-        log.info(msg)
-        self.log_signal.emit(msg)
-
-    @Slot()
-    def run(self) -> None:
+    def _compute(self) -> None:
         try:
-            with warnings.catch_warnings(record=True) as caught:
-                warnings.simplefilter("always")
-
+            with _capture_warnings() as caught:
                 self._emit(f"Berechne ChangeSet für {self.plugin_key}...")
                 cs = compute_changeset(self.students, self.plugin, self.max_suspend)
                 self._emit(
@@ -145,20 +205,23 @@ class PluginComputeWorker(QObject):
                 for w in caught:
                     self._emit(f"⚠ {w.message}")
 
-            self.finished.emit(self.plugin_key, cs)
+            self.signals.finished.emit(self.plugin_key, cs)
 
         except Exception as exc:
             log.exception("ComputeWorker fehlgeschlagen: %s", self.plugin_key)
-            self.error.emit(self.plugin_key, str(exc))
-
+            self.signals.error.emit(self.plugin_key, str(exc))
 
-class PluginApplyWorker(QObject):
-    """Wendet ein (bereits gefiltertes) ChangeSet auf ein Plugin an."""
 
+class PluginApplySignals(QObject):
     finished = Signal(str)  # plugin_key
     error = Signal(str, str)  # (plugin_key, error_message)
     log_signal = Signal(str)
     write_back_ready = Signal(str, list)  # (plugin_key, write_back_data)
+    done = Signal()
+
+
+class PluginApplyWorker(_PoolWorker):
+    """Wendet ein (bereits gefiltertes) ChangeSet auf ein Plugin an."""
 
     def __init__(
         self,
@@ -166,18 +229,12 @@ class PluginApplyWorker(QObject):
         plugin: PluginBase,
         changeset: ChangeSet,
     ) -> None:
-        super().__init__()
+        super().__init__(PluginApplySignals(), self._apply)
         self.plugin_key = plugin_key
         self.plugin = plugin
         self.changeset = changeset
 
-    def _emit(self, msg: str) -> None:
-        """Gibt Meldung ans GUI UND in spider.log aus."""
-        log.info(msg)
-        self.log_signal.emit(msg)
-
-    @Slot()
-    def run(self) -> None:
+    def _apply(self) -> None:
         try:
             cs = self.changeset
             phase = "init"
@@ -222,7 +279,7 @@ class PluginApplyWorker(QObject):
                 self._emit(
                     "Bitte \u00fcber 'R\u00fcckschreiben' an SchILD zur\u00fcckschreiben."
                 )
-                self.write_back_ready.emit(self.plugin_key, write_back_data)
+                self.signals.write_back_ready.emit(self.plugin_key, write_back_data)
 
             # Gruppenänderungen anwenden
             if cs.group_changes:
@@ -235,10 +292,10 @@ class PluginApplyWorker(QObject):
                     self._emit(f"  Gruppen: {ok} OK, {fail} Fehler")
 
             phase = "done"
-            self.finished.emit(self.plugin_key)
+            self.signals.finished.emit(self.plugin_key)
 
         except Exception as exc:
             log.exception(
                 "ApplyWorker fehlgeschlagen: %s (Phase: %s)", self.plugin_key, phase
             )
-            self.error.emit(self.plugin_key, f"{exc} (Phase: {phase})")
+            self.signals.error.emit(self.plugin_key, f"{exc} (Phase: {phase})")
@@ -15,6 +15,7 @@ from PySide6.QtWidgets import QApplication, QSplashScreen
 
 from core.paths import asset_path
 from gui.mainwindow import MainWindow
+from gui.workers import install_warning_capture
 
 # --- App-Metadaten ---
 APP_NAME = "Schild Spider"
@@ -156,6 +157,7 @@ def _install_exception_hook() -> None:
 def main() -> None:
     _setup_logging()
     _install_exception_hook()
+    install_warning_capture()
 
     app = QApplication(sys.argv)
     app.setApplicationName(APP_NAME)
@@ -6,7 +6,13 @@ from core.models import ChangeSet, ConfigField
 
 
 class PluginBase(ABC):
-    """Abstrakte Basisklasse für Output-Plugins."""
+    """Abstrakte Basisklasse für Output-Plugins.
+
+    Threading: Die GUI führt verschiedene Plugins parallel in Worker-Threads
+    aus, eine Instanz aber nie gleichzeitig in mehreren. Jede Instanz braucht
+    daher eigene HTTP-Sessions/Verbindungen; modulweiter Zustand muss
+    thread-safe sein.
+    """
 
     # --- Metadaten (jedes Plugin beschreibt sich selbst) ---
 
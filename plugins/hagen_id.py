@@ -13,6 +13,10 @@ _BATCH_SIZE_NEW = 200
 _BATCH_SIZE_CHANGE = 200
 _BATCH_SIZE_SUSPEND = 500
 
+# Blockgröße für den Foto-Hash: Vielfaches von 3, damit die Base64-Blöcke
+# ohne Padding aneinanderpassen (Hash identisch zur Komplett-Kodierung)
+_PHOTO_HASH_CHUNK_SIZE = 3 * 64 * 1024
+
 
 class HagenIdPlugin(PluginBase):
     """Output-Plugin für das Hagen-ID Schülerausweis-System (REST API)."""
@@ -142,9 +146,12 @@ class HagenIdPlugin(PluginBase):
         path = Path(photo_path)
         if not path.exists():
             return None
+        # Blockweise kodieren und hashen statt das ganze Foto zu laden
+        digest = hashlib.sha256()
         with open(path, "rb") as f:
-            b64 = base64.b64encode(f.read()).decode()
-        return hashlib.sha256(b64.encode()).hexdigest()
+            while chunk := f.read(_PHOTO_HASH_CHUNK_SIZE):
+                digest.update(base64.b64encode(chunk))
+        return digest.hexdigest()
 
 
 def _batched(items: list, size: int):
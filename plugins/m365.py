@@ -44,6 +44,9 @@ class M365Plugin(PluginBase):
         self._display_name_template = display_name_template or "{k} {n}, {v}"
         self._default_password = default_password or ""
         self._graph = GraphClient(tenant_id, client_id, client_secret)
+        # Token + Verbindung vorab, während GUI/Worker noch anlaufen
+        if tenant_id and client_id and client_secret:
+            self._graph.warmup()
 
         # Caches (pro Lauf)
         self._sus_cache: dict[str, str] = {}  # class_name → group_id
@@ -53,6 +56,7 @@ class M365Plugin(PluginBase):
         self._existing_emails: set[str] = set()  # gecached aus get_manifest
         self._all_users: list[dict] | None = None  # gecached für Lehrer-Suche
         self._groups_bulk_loaded: bool = False  # Gruppen-Cache komplett?
+        self._members_cache: dict[str, list[dict]] = {}  # group_id → Mitglieder
         # Lehrer-Matching: Kürzel → Email (aus Kursdaten + Klassenlehrer)
         self._kuerzel_to_email: dict[str, str] = {}
         self._kuerzel_to_name: dict[str, str] = {}
@@ -180,7 +184,7 @@ class M365Plugin(PluginBase):
     # --- Sync-Interface ---
 
     def get_manifest(self) -> list[dict]:
-        users = self._graph.list_users(self._domain)
+        users = self._graph.list_users_incremental(self._domain)
         # Email-Cache für enrich_preview und apply_new
         self._existing_emails = {
             (u.get("userPrincipalName") or "").lower() for u in users
@@ -253,104 +257,139 @@ class M365Plugin(PluginBase):
         self._generated_emails = []
         existing_emails = set(self._existing_emails) or self._collect_existing_emails()
         results: list[dict] = []
+        license_users: list[tuple[str, str]] = []  # (user_id, sid)
 
-        for student in students:
-            sid = student["school_internal_id"]
-            try:
-                email = (student.get("email") or "").strip()
-                if not email:
-                    email = generate_email(
-                        student.get("first_name", ""),
-                        student.get("last_name", ""),
-                        self._domain,
-                        self._email_template,
-                        existing_emails,
-                        class_name=student.get("class_name", ""),
+        # Vorhandene Emails aus SchILD gesammelt vorab auflösen statt
+        # ein GET pro Schüler; generierte Emails werden einzeln geprüft.
+        known_emails = [
+            e.lower() for s in students if (e := (s.get("email") or "").strip())
+        ]
+        try:
+            users_by_upn = self._graph.find_users_by_upns(known_emails)
+            prefetched = set(known_emails)
+        except GraphApiError as exc:
+            log.warning("UPN-Vorabsuche fehlgeschlagen, prüfe einzeln: %s", exc)
+            users_by_upn, prefetched = {}, set()
+
+        try:
+            for student in students:
+                sid = student["school_internal_id"]
+                try:
+                    email = (student.get("email") or "").strip()
+                    if not email:
+                        email = generate_email(
+                            student.get("first_name", ""),
+                            student.get("last_name", ""),
+                            self._domain,
+                            self._email_template,
+                            existing_emails,
+                            class_name=student.get("class_name", ""),
+                        )
+                        if email is None:
+                            results.append(
+                                {
+                                    "school_internal_id": sid,
+                                    "success": False,
+                                    "message": "Email-Kollision: manuell vergeben",
+                                }
+                            )
+                            continue
+
+                    # Generierte Email für Write-back merken
+                    self._generated_emails.append(
+                        {
+                            "school_internal_id": sid,
+                            "email": email,
+                            "first_name": student.get("first_name", ""),
+                            "last_name": student.get("last_name", ""),
+                            "class_name": student.get("class_name", ""),
+                        }
                     )
-                    if email is None:
+
+                    existing_emails.add(email.lower())
+
+                    # Prüfen ob User per Email schon existiert (ohne employeeId)
+                    if email.lower() in prefetched:
+                        existing_user = users_by_upn.get(email.lower())
+                    else:
+                        existing_user = self._graph.find_user_by_upn(email)
+                    if existing_user:
+                        user_id = existing_user["id"]
+                        self._graph.update_user(
+                            user_id,
+                            {
+                                "employeeId": sid,
+                                "department": student.get("class_name", ""),
+                                "displayName": self._format_display_name(student),
+                            },
+                        )
                         results.append(
                             {
                                 "school_internal_id": sid,
-                                "success": False,
-                                "message": "Email-Kollision: manuell vergeben",
+                                "success": True,
+                                "message": f"Verknüpft: {email}",
                             }
                         )
                         continue
 
-                # Generierte Email für Write-back merken
-                self._generated_emails.append(
-                    {
-                        "school_internal_id": sid,
-                        "email": email,
-                        "first_name": student.get("first_name", ""),
-                        "last_name": student.get("last_name", ""),
-                        "class_name": student.get("class_name", ""),
+                    user_data = {
+                        "accountEnabled": True,
+                        "displayName": self._format_display_name(student),
+                        "givenName": student.get("first_name", ""),
+                        "surname": student.get("last_name", ""),
+                        "userPrincipalName": email,
+                        "mailNickname": email.split("@")[0],
+                        "employeeId": sid,
+                        "department": student.get("class_name", ""),
+                        "usageLocation": self._usage_location,
+                        "passwordProfile": {
+                            "password": self._default_password or _generate_password(),
+                            "forceChangePasswordNextSignIn": True,
+                        },
                     }
-                )
 
-                existing_emails.add(email.lower())
+                    created = self._graph.create_user(user_data)
+                    license_users.append((created["id"], sid))
 
-                # Prüfen ob User per Email schon existiert (ohne employeeId)
-                existing_user = self._graph.find_user_by_upn(email)
-                if existing_user:
-                    user_id = existing_user["id"]
-                    self._graph.update_user(
-                        user_id,
-                        {
-                            "employeeId": sid,
-                            "department": student.get("class_name", ""),
-                            "displayName": self._format_display_name(student),
-                        },
+                    results.append(
+                        {"school_internal_id": sid, "success": True, "message": email}
                     )
+
+                except GraphApiError as exc:
                     results.append(
                         {
                             "school_internal_id": sid,
-                            "success": True,
-                            "message": f"Verknüpft: {email}",
+                            "success": False,
+                            "message": str(exc),
                         }
                     )
-                    continue
-
-                user_data = {
-                    "accountEnabled": True,
-                    "displayName": self._format_display_name(student),
-                    "givenName": student.get("first_name", ""),
-                    "surname": student.get("last_name", ""),
-                    "userPrincipalName": email,
-                    "mailNickname": email.split("@")[0],
-                    "employeeId": sid,
-                    "department": student.get("class_name", ""),
-                    "usageLocation": self._usage_location,
-                    "passwordProfile": {
-                        "password": self._default_password or _generate_password(),
-                        "forceChangePasswordNextSignIn": True,
-                    },
-                }
-
-                created = self._graph.create_user(user_data)
-                user_id = created["id"]
-
-                if self._license_sku_id:
-                    try:
-                        self._graph.assign_license(user_id, self._license_sku_id)
-                    except GraphApiError as exc:
-                        warnings.warn(f"Lizenz für {sid}: {exc}")
+        finally:
+            # Auch bei Abbruch (z.B. Netzwerkfehler beim POST) die bereits
+            # angelegten User lizenzieren — ein späterer Lauf sieht sie nicht
+            # mehr als neu und würde sie nie lizenzieren.
+            if self._license_sku_id and license_users:
+                self._assign_licenses(license_users)
 
-                results.append(
-                    {"school_internal_id": sid, "success": True, "message": email}
-                )
+        return results
 
-            except GraphApiError as exc:
-                results.append(
-                    {
-                        "school_internal_id": sid,
-                        "success": False,
-                        "message": str(exc),
-                    }
+    def _assign_licenses(self, license_users: list[tuple[str, str]]) -> None:
+        """Weist neu angelegten Usern die Lizenz per Batch zu (20 pro Request)."""
+        try:
+            responses = self._graph.assign_license_bulk(
+                [uid for uid, _ in license_users], self._license_sku_id
+            )
+        except GraphApiError as exc:
+            warnings.warn(f"Lizenzzuweisung fehlgeschlagen: {exc}")
+            return
+        for uid, sid in license_users:
+            resp = responses.get(uid, {})
+            status = resp.get("status", 0)
+            if status not in (200, 201, 204):
+                error = (resp.get("body") or {}).get("error", {})
+                warnings.warn(
+                    f"Lizenz für {sid}: {error.get('message', f'HTTP {status}')}"
                 )
 
-        return results
-
     def apply_changes(self, students: list[dict]) -> list[dict]:
         results: list[dict] = []
         for student in students:
@@ -505,7 +544,7 @@ class M365Plugin(PluginBase):
     def _collect_existing_emails(self) -> set[str]:
         """Sammelt alle existierenden Email-Adressen aus M365."""
         try:
-            users = self._graph.list_users(self._domain)
+            users = self._graph.iter_users(self._domain)
             return {(u.get("userPrincipalName") or "").lower() for u in users}
         except GraphApiError:
             return set()
@@ -566,8 +605,9 @@ class M365Plugin(PluginBase):
     def _bulk_load_groups(self, class_names: set[str]) -> None:
         """Lädt alle relevanten Gruppen in einem Durchgang (statt pro Klasse).
 
-        Extrahiert Prefix/Suffix aus den Templates und nutzt serverseitige
-        Filter (startsWith) oder lädt alle Gruppen einmal und filtert lokal.
+        Extrahiert Prefix/Suffix aus den Templates: mit Prefix filtert der
+        Server per startsWith (list_groups_many), bei reinem Suffix werden
+        die erwarteten Namen exakt abgefragt (list_groups_by_names).
         """
         self._groups_bulk_loaded = False
         sus_prefix, sus_suffix = _extract_template_parts(self._group_sus_template)
@@ -576,24 +616,19 @@ class M365Plugin(PluginBase):
         all_groups: list[dict] = []
 
         if sus_prefix or kuk_prefix:
-            # Serverseitig per startsWith filtern
-            loaded_prefixes: set[str] = set()
-            for prefix in (sus_prefix, kuk_prefix):
-                if prefix and prefix not in loaded_prefixes:
-                    all_groups.extend(self._graph.list_groups(prefix))
-                    loaded_prefixes.add(prefix)
+            # Serverseitig per startsWith filtern (beide Prefixe parallel)
+            prefixes = list(dict.fromkeys(p for p in (sus_prefix, kuk_prefix) if p))
+            for groups in self._graph.list_groups_many(prefixes):
+                all_groups.extend(groups)
         elif sus_suffix or kuk_suffix:
-            # Kein Prefix → alle Gruppen laden, client-seitig filtern
-            all_groups = self._graph.list_all_groups()
-            # Nur Gruppen behalten die zum Suffix passen
-            filtered: list[dict] = []
-            for g in all_groups:
-                dn = (g.get("displayName") or "").lower()
-                if sus_suffix and dn.endswith(sus_suffix.lower()):
-                    filtered.append(g)
-                elif kuk_suffix and dn.endswith(kuk_suffix.lower()):
-                    filtered.append(g)
-            all_groups = filtered
+            # Kein Prefix → startsWith nicht möglich; die erwarteten Namen
+            # sind aber bekannt, also exakt per "displayName in (...)" laden
+            names: list[str] = []
+            for class_name in class_names:
+                sanitized = _sanitize_nickname(class_name)
+                names.append(self._group_sus_template.replace("{k}", sanitized))
+                names.append(self._group_kuk_template.replace("{k}", sanitized))
+            all_groups = self._graph.list_groups_by_names(names)
         else:
             # Template ist nur {k} → Warnung, Fallback auf Einzel-Abfragen
             warnings.warn(
@@ -739,12 +774,25 @@ class M365Plugin(PluginBase):
             log.info("  %s → %s", key, gid)
         log.info("Bulk-Load komplett: %s", self._groups_bulk_loaded)
 
+        # Mitglieder aller bekannten Gruppen per $batch vorladen
+        group_ids = [*self._sus_cache.values(), *self._kuk_cache.values()]
+        self._members_cache = (
+            self._graph.get_members_many(group_ids) if group_ids else {}
+        )
+
         changes: list[dict] = []
         for class_name, class_students in sorted(classes.items()):
             changes.extend(self._diff_class_sus(class_name, class_students))
             changes.extend(self._diff_class_kuk(class_name, class_students))
         return changes
 
+    def _current_members(self, group_id: str) -> list[dict]:
+        """Mitglieder einer Gruppe — aus dem Batch-Vorladen, sonst einzeln."""
+        members = self._members_cache.get(group_id)
+        if members is None:
+            members = self._graph.get_members(group_id)
+        return members
+
     def _diff_class_sus(self, class_name: str, students: list[dict]) -> list[dict]:
         """Berechnet Diff für eine SuS-Gruppe (ohne auszuführen)."""
         changes: list[dict] = []
@@ -798,8 +846,7 @@ class M365Plugin(PluginBase):
         # IST: aktuelle Mitglieder (nur bei existierenden Gruppen)
         actual_ids: set[str] = set()
         if group_id:
-            current_members = self._graph.get_members(group_id)
-            actual_ids = {m["id"] for m in current_members}
+            actual_ids = {m["id"] for m in self._current_members(group_id)}
 
         for uid in sorted(expected_ids - actual_ids):
             changes.append(
@@ -882,8 +929,7 @@ class M365Plugin(PluginBase):
         # IST
         actual_ids: set[str] = set()
         if group_id:
-            current_members = self._graph.get_members(group_id)
-            actual_ids = {m["id"] for m in current_members}
+            actual_ids = {m["id"] for m in self._current_members(group_id)}
 
         for uid in sorted(expected_ids - actual_ids):
             changes.append(
@@ -973,7 +1019,6 @@ class M365Plugin(PluginBase):
 
     def _apply_member_changes_batched(self, changes: list[dict]) -> list[dict]:
         """Führt add_member/remove_member als Batch-Requests aus (max 20 pro Batch)."""
-        _GRAPH_BASE_URL = "https://graph.microsoft.com/v1.0"
         batch_limit = self._graph._BATCH_LIMIT
         results: list[dict] = []
 
@@ -1002,9 +1047,7 @@ class M365Plugin(PluginBase):
                             "method": "POST",
                             "url": f"/groups/{group_id}/members/$ref",
                             "headers": {"Content-Type": "application/json"},
-                            "body": {
-                                "@odata.id": f"{_GRAPH_BASE_URL}/directoryObjects/{ch['member_id']}"
-                            },
+                            "body": self._graph.member_ref(ch["member_id"]),
                         },
                     )
                 )
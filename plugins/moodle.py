@@ -6,6 +6,7 @@ import hashlib
 import logging
 import re
 import warnings
+from collections.abc import Callable
 
 from core.moodle_client import MoodleApiError, MoodleClient
 from core.models import ConfigField
@@ -573,6 +574,7 @@ class MoodlePlugin(PluginBase):
                     parent_id = None  # Wird erst bei apply bekannt
 
         # --- Kurs- und Einschreibungs-Änderungen ---
+        course_rows: list[tuple] = []
         for key, student_ids in sorted(course_map.items()):
             meta = course_meta[key]
             teacher_name = meta["teacher_name"]
@@ -595,7 +597,32 @@ class MoodlePlugin(PluginBase):
                 cat_path = class_to_cat_path.get(
                     class_for_template, [class_for_template]
                 )
+            course_rows.append(
+                (
+                    meta,
+                    student_ids,
+                    teacher_name,
+                    display_name,
+                    idnumber,
+                    class_for_template,
+                    cat_path,
+                )
+            )
+
+        # Kurse + Einschreibungen parallel vorladen statt je ein Request pro Kurs
+        enrolled_by_course, absent_courses = self._prefetch_courses(
+            [row[4] for row in course_rows]
+        )
 
+        for (
+            meta,
+            student_ids,
+            teacher_name,
+            display_name,
+            idnumber,
+            class_for_template,
+            cat_path,
+        ) in course_rows:
             shortname = self._format_course_name(
                 self._shortname_tpl, class_for_template, display_name, teacher_name
             )
@@ -605,7 +632,7 @@ class MoodlePlugin(PluginBase):
 
             # Kurs in Moodle suchen
             existing_course = self._course_cache.get(idnumber)
-            if not existing_course:
+            if not existing_course and idnumber not in absent_courses:
                 try:
                     found = self._moodle.get_courses_by_field("idnumber", idnumber)
                     if found:
@@ -647,7 +674,9 @@ class MoodlePlugin(PluginBase):
             enrolled_teacher_ids: set[int] = set()
             if course_id:
                 try:
-                    enrolled = self._moodle.get_enrolled_users(course_id)
+                    enrolled = enrolled_by_course.get(course_id)
+                    if enrolled is None:
+                        enrolled = self._moodle.get_enrolled_users(course_id)
                     for eu in enrolled:
                         roles = [r.get("roleid") for r in eu.get("roles", [])]
                         if self._role_teacher in roles:
@@ -769,10 +798,61 @@ class MoodlePlugin(PluginBase):
 
         return changes
 
+    def _prefetch_courses(
+        self, idnumbers: list[str]
+    ) -> tuple[dict[int, list[dict]], set[str]]:
+        """Sucht Kurse und lädt deren Einschreibungen parallel vor.
+
+        Füllt self._course_cache. Returns: ({course_id: eingeschriebene User},
+        idnumbers die in Moodle sicher nicht existieren). Fehlgeschlagene
+        Abfragen fehlen in beiden und werden vom Aufrufer einzeln wiederholt
+        (mit der üblichen Fehlerbehandlung).
+        """
+        missing = [i for i in dict.fromkeys(idnumbers) if i not in self._course_cache]
+        found = self._moodle.map_calls(
+            [
+                ("core_course_get_courses_by_field", {"field": "idnumber", "value": i})
+                for i in missing
+            ],
+            return_exceptions=True,
+        )
+        absent: set[str] = set()
+        for idnumber, result in zip(missing, found, strict=True):
+            if not isinstance(result, dict):
+                continue
+            if result.get("courses"):
+                self._course_cache[idnumber] = result["courses"][0]
+            else:
+                absent.add(idnumber)
+
+        course_ids = list(
+            dict.fromkeys(
+                self._course_cache[i]["id"]
+                for i in idnumbers
+                if i in self._course_cache
+            )
+        )
+        enrolled = self._moodle.map_calls(
+            [
+                ("core_enrol_get_enrolled_users", {"courseid": cid})
+                for cid in course_ids
+            ],
+            return_exceptions=True,
+        )
+        enrolled_by_course = {
+            cid: users
+            for cid, users in zip(course_ids, enrolled, strict=True)
+            if isinstance(users, list)
+        }
+        return enrolled_by_course, absent
+
     def apply_group_changes(self, changes: list[dict]) -> list[dict]:
         """Führt die vom User ausgewählten Kurs-/Einschreibungsänderungen aus."""
         self._load_categories()
         results: list[dict] = []
+        # Ein-/Abmeldungen sammeln und nach den Kursen gebündelt senden
+        enrolments: list[tuple[dict, dict]] = []  # (change, enrolment)
+        unenrolments: list[tuple[dict, dict]] = []
 
         for ch in changes:
             action = ch["action"]
@@ -886,22 +966,15 @@ class MoodlePlugin(PluginBase):
 
                     if course_id:
                         role_id = ch.get("role_id", self._role_student)
-                        self._moodle.enrol_users(
-                            enrolments=[
+                        enrolments.append(
+                            (
+                                ch,
                                 {
                                     "roleid": role_id,
                                     "userid": int(ch["member_id"]),
                                     "courseid": int(course_id),
-                                }
-                            ]
-                        )
-                        results.append(
-                            {
-                                "action": "enrol",
-                                "group": ch["group_name"],
-                                "success": True,
-                                "message": ch["member_name"],
-                            }
+                                },
+                            )
                         )
                     else:
                         results.append(
@@ -917,21 +990,14 @@ class MoodlePlugin(PluginBase):
                     # Abmeldung
                     course_id = ch.get("course_id")
                     if course_id:
-                        self._moodle.unenrol_users(
-                            enrolments=[
+                        unenrolments.append(
+                            (
+                                ch,
                                 {
                                     "userid": int(ch["member_id"]),
                                     "courseid": int(course_id),
-                                }
-                            ]
-                        )
-                        results.append(
-                            {
-                                "action": "unenrol",
-                                "group": ch["group_name"],
-                                "success": True,
-                                "message": ch["member_name"],
-                            }
+                                },
+                            )
                         )
 
             except MoodleApiError as exc:
@@ -944,8 +1010,46 @@ class MoodlePlugin(PluginBase):
                     }
                 )
 
+        results.extend(
+            self._apply_enrolments(enrolments, self._moodle.enrol_users, "enrol")
+        )
+        results.extend(
+            self._apply_enrolments(unenrolments, self._moodle.unenrol_users, "unenrol")
+        )
         return results
 
+    @staticmethod
+    def _apply_enrolments(
+        pending: list[tuple[dict, dict]], send: Callable[..., None], action: str
+    ) -> list[dict]:
+        """Sendet Ein-/Abmeldungen gebündelt (ein Request statt einer pro User).
+
+        Moodle führt einen Aufruf als Transaktion aus — schlägt er fehl, werden
+        die Einträge einzeln wiederholt, um den fehlerhaften zu finden.
+        """
+        if not pending:
+            return []
+        failed: dict[int, str] = {}  # Index in pending → Fehlermeldung
+        try:
+            send(enrolments=[e for _, e in pending])
+        except MoodleApiError as exc:
+            log.warning("%s gebündelt fehlgeschlagen (%s), einzeln...", action, exc)
+            for idx, (_, enrolment) in enumerate(pending):
+                try:
+                    send(enrolments=[enrolment])
+                except MoodleApiError as item_exc:
+                    failed[idx] = str(item_exc)
+
+        return [
+            {
+                "action": action,
+                "group": ch["group_name"],
+                "success": idx not in failed,
+                "message": failed.get(idx, ch["member_name"]),
+            }
+            for idx, (ch, _) in enumerate(pending)
+        ]
+
 
 def _sanitize(text: str) -> str:
     """Bereinigt Text für IDs (a-z, 0-9, -, _)."""